@@ -7,10 +7,13 @@ from io import BytesIO
 from streamlit.components.v1 import html
 from datetime import datetime
 
+from sensor_calibration import load_calibration
+from wear_bands import DEFAULT_SCHEME
+
 def update_database_from_latest(latest_file, db_file):
     """
     读取最新读数文件，匹配ID并追加到数据库对应工作表中。
-    返回更新后的数据库字典和最新读数DataFrame。
+    返回更新后的数据库字典（厚度已按 calibration.yaml 校准）和最新读数DataFrame。
     """
     # 读取最新读数文件
     latest_df = pd.read_excel(latest_file, sheet_name=0)
@@ -20,13 +23,16 @@ def update_database_from_latest(latest_file, db_file):
     # 读取数据库所有工作表
     xls = pd.ExcelFile(db_file)
     db_dict = pd.read_excel(xls, sheet_name=None)
+    db_dict = load_calibration().apply_frames(db_dict)
 
     return db_dict, latest_df
 
-def get_latest_sensor_status(db_dict):
+def get_latest_sensor_status(db_dict, scheme=DEFAULT_SCHEME, calibration=None):
     """
     从数据库字典中提取每个传感器的最新一条记录，用于状态显示。
-    返回DataFrame，列：sensorName, latestTime, totalLength, actualLength
+    返回DataFrame，列：sensorName, latestTime, totalLength, actualLength, band
+    band 由 scheme（wear_bands.BandScheme）按 actualLength 分类，db_dict 为校准后的厚度时
+    传入 calibration（sensor_calibration.CalibrationTable），按各传感器的校准系数对照刻度线分类。
     """
     results = []
     for sheet_name, df in db_dict.items():
@@ -45,22 +51,21 @@ def get_latest_sensor_status(db_dict):
                 'totalLength': last_row['InitialThickness'],
                 'actualLength': last_row['CurrentThickness']
             })
-    return pd.DataFrame(results)
+    status = pd.DataFrame(results, columns=['sensorName', 'latestTime', 'totalLength', 'actualLength'])
+    scale, offset = (1.0, 0.0) if calibration is None else calibration.coefficient_arrays(status['sensorName'])
+    status['band'] = scheme.classify(status['actualLength'].to_numpy(dtype='float64'), scale, offset)
+    return status
 
-def plot_sensor_data_from_dict(db_dict):
+def plot_sensor_data_from_dict(db_dict, scheme=DEFAULT_SCHEME, calibration=None):
     """
     基于数据库字典绘制每个传感器的CurrentThickness随时间变化曲线，
     并添加水平线标注InitialThickness，以及预定义的磨损阈值线。
+    曲线为校准后的厚度时传入 calibration，阈值线按默认校准系数画在对应位置。
     """
     fig = go.Figure()
     
-    # 定义阈值线和颜色
-    threshold_lines = [
-        (31, 'black'), (30, 'black'), (26, 'black'), (22, 'black'),
-        (18, 'blue'),
-        (14, 'orange'), (12, 'orange'),
-        (10, 'red')
-    ]
+    # 阈值线和颜色（颜色与状态区间一致）
+    threshold_lines = scheme.threshold_lines(*(calibration.default if calibration is not None else ()))
     
     # 添加全局阈值水平线（粗实线）
     for y_val, color in threshold_lines:
@@ -83,7 +88,7 @@ def plot_sensor_data_from_dict(db_dict):
         # 添加当前厚度曲线
         fig.add_trace(go.Scatter(
             x=df['SensorScanTime'],
-            y=df['CurrentThickness']+1,  # 加1mm作为当前厚度的容差
+            y=df['CurrentThickness'],
             mode='lines+markers',
             name=f"{sheet_name} (Current)"
         ))
@@ -93,7 +98,7 @@ def plot_sensor_data_from_dict(db_dict):
             y=init_val,
             line_dash="dash",
             line_color="gray",
-            annotation_text=f"{sheet_name} Init: {init_val+1}mm",
+            annotation_text=f"{sheet_name} Init: {init_val}mm",
             annotation_position="top left"
         )
     
@@ -179,9 +184,10 @@ def app():
     
     # 1. 更新数据库并获取最新数据字典
     db_dict, latest_df = update_database_from_latest(latest_file, db_file)
+    calibration = load_calibration()
     
     # 2. 获取传感器最新状态
-    sensor_status_df = get_latest_sensor_status(db_dict)
+    sensor_status_df = get_latest_sensor_status(db_dict, calibration=calibration)
     
     # ------------------ 界面显示 ------------------
     st.markdown("1. Wear Sensor Installation Details")
@@ -454,11 +460,8 @@ def app():
         for row in sensor_status_df.itertuples():
             sensor_name = row.sensorName
             latest_time = row.latestTime
-            total_len = 32  # 加1mm作为初始厚度的容差
-            if row.actualLength == 31:
-                actual_len = 32  # 特例处理，保持31mm不变
-            else:
-                actual_len = row.actualLength - 1.5  # 加1mm作为当前厚度的容差
+            total_len = row.totalLength  # 厚度已在加载时校准
+            actual_len = row.actualLength
 
             # 显示metric
             if pd.notna(total_len):
@@ -486,23 +489,23 @@ def app():
                 if sheet_df is not None and not sheet_df.empty:
                     thickness_vals = sheet_df['CurrentThickness'].drop_duplicates().sort_values(ascending=False).tolist()
 
-                # 条件分支
-                if actual_len > 18:
+                # 根据状态区间进行条件判断（区间已在 get_latest_sensor_status 中按校准系数计算）
+                if row.band == 'ok':
                     st.info("Acceptable thickness, use as normal!")
                     # 若当前厚度不等于初始厚度，显示区间信息
                     if actual_len != total_len:
                         #st.markdown("test point 1")
-                        if thickness_vals and actual_len+1.5 in thickness_vals:
-                            idx = thickness_vals.index(actual_len+1.5)
+                        if thickness_vals and actual_len in thickness_vals:
+                            idx = thickness_vals.index(actual_len)
                             #st.markdown("test point 2")
                             if idx > 0:  # 存在更大的值
-                                next_larger = thickness_vals[idx - 1] - 1.5
+                                next_larger = thickness_vals[idx - 1]
                                 st.info(f"Actual thickness is between {actual_len} and {next_larger}")
-                elif actual_len == 18:
+                elif row.band == 'order':
                     st.info("Please order trays!")
-                elif 10 < actual_len < 18:
+                elif row.band == 'inspect':
                     st.warning("Wearing thin, inspections required!")
-                elif actual_len == 10:
+                elif row.band == 'replace':
                     st.error("Replace!")
         
         
@@ -510,7 +513,7 @@ def app():
         # 绘制传感器曲线
         st.markdown("###")
         st.markdown("3. Wear Sensor Plots")
-        fig = plot_sensor_data_from_dict(db_dict)
+        fig = plot_sensor_data_from_dict(db_dict, calibration=calibration)
         st.plotly_chart(fig)
         
         # 下载数据库按钮（需调整downloadData以适配新列名，此处暂不调用）
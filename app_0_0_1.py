@@ -1,11 +1,10 @@
 import streamlit as st
 from multipage import MultiPage
-from spages import Golding830E2507
+from asset_registry import load_registry
+from image_assets import asset_image, LOGO_WIDTH
 from streamlit.components.v1 import html
 
-import yaml
-from yaml.loader import SafeLoader
-import streamlit_authenticator as stauth
+from auth import get_authenticator, issue_session_token, validate_session_token
 
 
 # 主页面
@@ -32,9 +31,11 @@ def main_page():
     
     ####### Actual App Content ########
     app = MultiPage()
-    # add applications
-    app.add_page('🔵  Boddington Linerless Tray', Golding830E2507.app)
-    #app.add_page('🟢  SAG Mill #2', SAG25NOV.app)
+    # add applications：车队总览 + 资产登记表（assets.yaml）中的每个资产一个页面
+    # 页面以模块路径登记，选中时才导入（pandas/plotly等只在打开页面时加载）
+    app.add_page('📊  Fleet Overview', 'spages.FleetOverview:app')
+    for asset in load_registry():
+        app.add_page(asset.label, 'spages.Golding830E2507:asset_app', asset)
     app.run()
 
     # 在侧边栏显示已登录的用户信息
@@ -45,6 +46,7 @@ def main_page():
 
     if st.sidebar.button("logout"):
         st.session_state['logged_in'] = False
+        st.session_state.pop('session_token', None)
         st.session_state.pop('name', None)
         st.session_state.pop('username', None)
         st.rerun()
@@ -74,16 +76,9 @@ def login_page():
             )
 
 
-    st.logo("bisalloy.png")
-    with open('config.yaml') as file:
-        config = yaml.load(file, Loader=SafeLoader)
-
-    authenticator = stauth.Authenticate(
-        config['credentials'],
-        config['cookie']['name'],
-        config['cookie']['key'],
-        config['cookie']['expiry_days']
-    )
+    st.logo(asset_image("bisalloy.png", LOGO_WIDTH))
+    # 凭据配置在进程内缓存，config.yaml 修改后才重新读取
+    authenticator = get_authenticator()
 
     name, authentication_status, username = authenticator.login(':material/Apps: :rainbow[Bisalloy Digital App]', 'main')
 
@@ -91,6 +86,7 @@ def login_page():
         
         st.success(f"Welcome Back!  {name}!")
         st.session_state['logged_in'] = True
+        st.session_state['session_token'] = issue_session_token(username)  # 之后的rerun只校验签名令牌
         st.session_state['name'] = name  # 存储用户姓名
         st.session_state['username'] = username  # 存储用户名
         st.rerun()  # 刷新页面，跳转到主页面
@@ -116,6 +112,9 @@ def main():
     
     if 'logged_in' not in st.session_state:
         st.session_state['logged_in'] = False
+    # 会话令牌过期或凭据配置变更（例如删除了用户）后需要重新登录
+    if st.session_state['logged_in'] and validate_session_token(st.session_state.get('session_token')) is None:
+        st.session_state['logged_in'] = False
 
     # 根据登录状态显示不同页面
     if st.session_state['logged_in']:
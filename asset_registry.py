@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+import yaml
+from yaml.loader import SafeLoader
+
+from stat_cache import StatCache
+
+# 登记表在登录后的第一次rerun就要读取，这里只依赖yaml，不导入pandas等页面用到的重型模块
+REGISTRY_FILE = "assets.yaml"
+
+# 进程级缓存：登记表文件 -> AssetRegistry
+_REGISTRIES = StatCache()
+
+
+class Asset:
+    """
+    登记表中的一个资产（一台卡车的货箱）：标识、显示信息、数据文件和传感器列表。
+    sensors 中每项至少有 id（如 01C），可选 position（安装位置）。
+    """
+    def __init__(self, id, title, latest_file, db_file, store_file, drop_dir=None,
+                 icon="", site="", truck="", tray="", heading=None, image=None, sensors=None):
+        self.id = id
+        self.title = title
+        self.icon = icon
+        self.site = site
+        self.truck = truck
+        self.tray = tray
+        self.heading = heading or title
+        self.image = image
+        self.latest_file = latest_file
+        self.db_file = db_file
+        self.store_file = store_file
+        self.drop_dir = drop_dir
+        self.sensors = [dict(sensor, id=str(sensor['id'])) for sensor in (sensors or [])]
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(**config)
+
+    @property
+    def label(self):
+        """导航栏中显示的名称。"""
+        return f"{self.icon}  {self.title}".strip()
+
+    @property
+    def sensor_sheets(self):
+        """登记的传感器对应的工作表名（BDT-LLT-01C ...），按登记顺序。"""
+        from sensor_ingest import sensor_sheet_name
+        return [sensor_sheet_name(sensor['id']) for sensor in self.sensors]
+
+    def __repr__(self):
+        # 导航控件按选项的文本表示区分页面，保持与对象地址无关
+        return f"Asset({self.id!r})"
+
+
+class AssetRegistry:
+    """资产登记表，按登记顺序迭代，可按 id 查找。"""
+    def __init__(self, assets):
+        self.assets = list(assets)
+        self._by_id = {asset.id: asset for asset in self.assets}
+        if len(self._by_id) != len(self.assets):
+            raise ValueError("duplicate asset id in registry")
+
+    def __iter__(self):
+        return iter(self.assets)
+
+    def __len__(self):
+        return len(self.assets)
+
+    def get(self, asset_id):
+        return self._by_id[asset_id]
+
+
+def _parse_registry(path):
+    with open(path, encoding='utf-8') as f:
+        config = yaml.load(f, Loader=SafeLoader) or {}
+    return AssetRegistry(Asset.from_config(asset) for asset in config.get('assets', []))
+
+
+def load_registry(path=REGISTRY_FILE):
+    """读取资产登记表（按修改时间和大小缓存，修改文件后下一次rerun生效）。"""
+    return _REGISTRIES.get(path, _parse_registry)
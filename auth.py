@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import hmac
+import threading
+import time
+
+import yaml
+from yaml.loader import SafeLoader
+import streamlit_authenticator as stauth
+
+from stat_cache import StatCache
+
+CONFIG_FILE = "config.yaml"
+# 登录后会话令牌的有效期（秒），覆盖一个班次
+SESSION_TTL_SECONDS = 12 * 3600
+MAX_CACHED_TOKENS = 4096
+
+# 进程级缓存：配置文件 -> (配置内容的sha1, 配置dict)
+_CONFIGS = StatCache()
+# 已验证的会话令牌：令牌 -> (配置sha1, 用户名, 过期时间)
+_TOKENS = {}
+_LOCK = threading.Lock()
+
+
+def load_auth_config(path=CONFIG_FILE):
+    """
+    读取用户凭据配置（config.yaml），进程内只解析一次，文件修改时间或大小变化时重新读取。
+    返回 (配置内容的sha1, 配置dict)；配置dict为共享对象，不要修改。
+    """
+    return _CONFIGS.get(path, _parse_auth_config)
+
+
+def _parse_auth_config(path):
+    with open(path, 'rb') as f:
+        content = f.read()
+    return hashlib.sha1(content).hexdigest(), yaml.load(content, Loader=SafeLoader)
+
+
+def get_authenticator(path=CONFIG_FILE):
+    """
+    用缓存的配置创建登录组件。stauth.Authenticate 内含Cookie组件，必须在每次rerun中创建，
+    但不再重复读取和解析YAML；bcrypt校验只在提交登录表单时进行。
+    """
+    _, config = load_auth_config(path)
+    credentials = dict(config['credentials'])  # Authenticate 会改写 usernames，不修改共享配置
+    return stauth.Authenticate(
+        credentials,
+        config['cookie']['name'],
+        config['cookie']['key'],
+        config['cookie']['expiry_days']
+    )
+
+
+def _sign(key, payload):
+    return hmac.new(key.encode('utf-8'), payload.encode('utf-8'), hashlib.sha256).hexdigest()
+
+
+def issue_session_token(username, path=CONFIG_FILE, ttl=SESSION_TTL_SECONDS, now=None):
+    """
+    登录成功后签发会话令牌 "用户名:过期时间:签名"。签名覆盖凭据配置的哈希，
+    修改 config.yaml（例如删除用户）后旧令牌自动失效。
+    """
+    digest, config = load_auth_config(path)
+    expires = int((time.time() if now is None else now) + ttl)
+    payload = f"{username}:{expires}:{digest}"
+    return f"{username}:{expires}:{_sign(config['cookie']['key'], payload)}"
+
+
+def validate_session_token(token, path=CONFIG_FILE, now=None):
+    """
+    校验会话令牌，有效时返回用户名，否则返回None。
+    签名用 hmac.compare_digest 做常数时间比较；验证过的令牌缓存在进程内，
+    之后的rerun只检查过期时间和配置是否变化。
+    """
+    if not token:
+        return None
+    now = time.time() if now is None else now
+    digest, config = load_auth_config(path)
+    with _LOCK:
+        cached = _TOKENS.get(token)
+    if cached is not None and cached[0] == digest:
+        return cached[1] if cached[2] > now else None
+
+    try:
+        username, expires, signature = token.rsplit(':', 2)
+        expires = int(expires)
+    except ValueError:
+        return None
+    expected = _sign(config['cookie']['key'], f"{username}:{expires}:{digest}")
+    if not hmac.compare_digest(expected, signature):
+        return None
+    if username.lower() not in {name.lower() for name in config['credentials']['usernames']}:
+        return None
+    with _LOCK:
+        if len(_TOKENS) >= MAX_CACHED_TOKENS:
+            _TOKENS.clear()
+        _TOKENS[token] = (digest, username, expires)
+    return username if expires > now else None
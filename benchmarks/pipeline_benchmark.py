@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""
+入库 -> 状态 -> 绘图 -> 导出 流程的基准测试（无需启动Streamlit服务）。
+
+按现有数据库格式（每个传感器 ServerUpdateTime, SensorScanTime, InitialThickness,
+CurrentThickness, Wear）生成指定规模的合成车队数据，逐个阶段计时并记录峰值内存，
+结果以JSON输出，便于在每次部署前对比性能回退。
+
+用法（在仓库根目录运行）：
+    python -m benchmarks.pipeline_benchmark --sensors 60 --readings 20000 --output bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from data_cache import enable_copy_on_write
+from sensor_calibration import CalibratedStore
+from sensor_export import available_formats, write_export
+from sensor_ingest import SENSOR_PREFIX
+from sensor_runs import load_runs, runs_to_steps
+from sensor_store import DB_COLUMNS, load_long_frame, open_store
+from spages.Golding830E2507 import (build_dashboard_data, get_latest_sensor_status,
+                                    plot_sensor_data_from_dict, update_database_from_latest)
+
+# 传感器刻度线（mm），合成数据的厚度沿这些台阶逐级下降
+THICKNESS_STEPS = (31, 30, 26, 22, 18, 14, 12, 10)
+HEARTBEAT = pd.Timedelta(minutes=30)
+
+
+def synthetic_readings(sensors, readings, seed=0, start="2025-01-01"):
+    """
+    生成合成车队读数：每个传感器 readings 条心跳，厚度按随机的磨损进度沿刻度线下降。
+    返回带 Sheet 列的长表（DB_COLUMNS），可直接追加到存储。
+    """
+    rng = np.random.default_rng(seed)
+    names = [f"{SENSOR_PREFIX}{i + 1:03d}C" for i in range(sensors)]
+    scan = pd.Timestamp(start) + HEARTBEAT * np.arange(readings)
+    frames = []
+    for name in names:
+        # 每个传感器在整个时间段内磨损到第 k 条刻度线，k 随机
+        worn = rng.integers(1, len(THICKNESS_STEPS) + 1)
+        edges = np.sort(rng.choice(np.arange(1, readings), size=worn - 1, replace=False))
+        current = np.asarray(THICKNESS_STEPS, dtype='float64')[np.searchsorted(edges, np.arange(readings), 'right')]
+        frames.append(pd.DataFrame({
+            'Sheet': name,
+            'ServerUpdateTime': scan + pd.Timedelta(seconds=5),
+            'SensorScanTime': scan,
+            'InitialThickness': float(THICKNESS_STEPS[0]),
+            'CurrentThickness': current,
+            'Wear': THICKNESS_STEPS[0] - current,
+        }))
+    return names, pd.concat(frames, ignore_index=True)
+
+
+def build_store(path, sensors, readings, seed=0):
+    """生成合成数据并写入存储（.sqlite 或 .xlsx 工作簿），返回传感器名列表。"""
+    names, rows = synthetic_readings(sensors, readings, seed)
+    if path.endswith('.xlsx'):
+        with pd.ExcelWriter(path, engine='openpyxl') as writer:
+            for name, df in rows.groupby('Sheet', sort=False):
+                df[DB_COLUMNS].to_excel(writer, sheet_name=name, index=False)
+    else:
+        store = open_store(path)
+        store.add_sensors(names)
+        store.append(rows)
+    return names
+
+
+def write_latest(path, names, scan_time):
+    """生成一份最新读数文件（每个传感器一条，格式同 pwsReadingsLatest.xlsx）。"""
+    pd.DataFrame({
+        'uploadTime': scan_time,
+        'ID': [name[len(SENSOR_PREFIX):] for name in names],
+        'SensorTotalLength': float(THICKNESS_STEPS[0]),
+        'SensorCurrentLength': float(THICKNESS_STEPS[-1]),
+    }).to_excel(path, index=False)
+
+
+def measure(func, repeat):
+    """运行 func repeat 次计时，再在tracemalloc下运行一次记录峰值内存。"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        'min_s': min(timings),
+        'median_s': statistics.median(timings),
+        'max_s': max(timings),
+        'peak_mem_bytes': peak,
+    }
+
+
+def run_benchmark(sensors, readings, repeat=3, backend='sqlite', formats=None, workdir=None, seed=0):
+    """
+    生成合成数据并对每个阶段计时，返回可JSON序列化的结果字典。
+    阶段：load（冷启动读取存储）、update_database_from_latest（增量入库）、status、
+    plot（全部读数 / 台阶点）、build_dashboard_data（后台线程的完整预计算）、export_<格式>。
+    """
+    own_dir = workdir is None
+    workdir = tempfile.mkdtemp(prefix='wearfusion_bench_') if own_dir else workdir
+    os.makedirs(workdir, exist_ok=True)
+    formats = available_formats() if formats is None else formats
+    try:
+        store_path = os.path.join(workdir, 'fleet' + ('.xlsx' if backend == 'xlsx' else '.sqlite'))
+        started = time.perf_counter()
+        names = build_store(store_path, sensors, readings, seed)
+        generate_s = time.perf_counter() - started
+
+        stages = {}
+        stages['load'] = measure(lambda: open_store(store_path).load(), repeat)
+
+        store = open_store(store_path)
+        view = CalibratedStore(store)
+        # 预先生成 measure 需要的 repeat+1 份最新读数文件（扫描时间逐个递增，保证每次都有新读数入库），
+        # 计时区间内只包含入库本身，不包含用openpyxl写文件的时间
+        latest_files = []
+        for i in range(repeat + 1):
+            scan_time = pd.Timestamp("2030-01-01") + pd.Timedelta(hours=i + 1)
+            latest_files.append(os.path.join(workdir, f"latest_{scan_time:%Y%m%d%H}.xlsx"))
+            write_latest(latest_files[-1], names, scan_time)
+        pending = iter(latest_files)
+        stages['update_database_from_latest'] = measure(
+            lambda: update_database_from_latest(next(pending), store), repeat)
+
+        db_dict = view.load()
+        stages['status'] = measure(lambda: get_latest_sensor_status(db_dict), repeat)
+        long_df = load_long_frame(view)
+        stages['status_cached_long_frame'] = measure(
+            lambda: get_latest_sensor_status(db_dict, long_df=long_df), repeat)
+        stages['plot_readings'] = measure(lambda: plot_sensor_data_from_dict(db_dict), repeat)
+        chart = {name: runs_to_steps(runs) for name, runs in load_runs(view).items()}
+        stages['plot_steps'] = measure(lambda: plot_sensor_data_from_dict(chart), repeat)
+        stages['build_dashboard_data'] = measure(
+            lambda: build_dashboard_data(CalibratedStore(open_store(store_path)), None), repeat)
+
+        for fmt in formats:
+            target = os.path.join(workdir, f"export.{fmt}")
+            stages[f"export_{fmt}"] = measure(lambda: write_export(view, target, fmt), repeat)
+            stages[f"export_{fmt}"]['size_bytes'] = os.path.getsize(target)
+
+        return {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'params': {
+                'sensors': sensors,
+                'readings_per_sensor': readings,
+                'rows': sensors * readings,
+                'repeat': repeat,
+                'backend': backend,
+                'seed': seed,
+            },
+            'generate_s': generate_s,
+            'stages': stages,
+        }
+    finally:
+        if own_dir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="WearFusion pipeline benchmark")
+    parser.add_argument('--sensors', type=int, default=30)
+    parser.add_argument('--readings', type=int, default=5000, help="heartbeat readings per sensor")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--backend', choices=['sqlite', 'xlsx'], default='sqlite')
+    parser.add_argument('--formats', nargs='*', default=None, help="export formats (default: all available)")
+    parser.add_argument('--workdir', default=None, help="keep generated files in this directory")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=None, help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    # 与Streamlit应用（app_0_0_1.main_page）使用相同的pandas设置
+    enable_copy_on_write()
+    result = run_benchmark(args.sensors, args.readings, args.repeat, args.backend,
+                           args.formats, args.workdir, args.seed)
+    text = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        sys.stdout.write(text + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+
+
+def _as_float(x):
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype('datetime64[ns]').view('int64').astype('float64')
+    return x.astype('float64')
+
+
+def visible_slice(x, start=None, end=None):
+    """
+    返回落在 [start, end] 时间范围内的切片（x需升序）。两端各多保留一个点，
+    使曲线在可见区域边缘保持连续。
+    """
+    x = np.asarray(x)
+    lo = 0 if start is None else max(np.searchsorted(x, np.datetime64(start, 'ns'), side='left') - 1, 0)
+    hi = len(x) if end is None else min(np.searchsorted(x, np.datetime64(end, 'ns'), side='right') + 1, len(x))
+    return slice(lo, hi)
+
+
+def lttb(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets 降采样，返回保留点的下标（升序，包含首尾点）。
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = _as_float(x)
+    y = np.asarray(y, dtype='float64')
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    keep = np.empty(n_out, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # 下一个桶的平均点
+        nxt_lo, nxt_hi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[nxt_lo:nxt_hi].mean() if nxt_hi > nxt_lo else x[-1]
+        avg_y = y[nxt_lo:nxt_hi].mean() if nxt_hi > nxt_lo else y[-1]
+        area = np.abs(
+            (x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a])
+        )
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
+
+
+def minmax_steps(x, y, n_out):
+    """
+    保留台阶边缘的 min/max 分桶降采样，返回保留点的下标（升序）。
+    台阶型数据先保留每次数值变化前后的两个点；变化点超出预算时
+    再按时间分桶，每桶保留首、尾、最小、最大四个点。
+    """
+    n = len(y)
+    if n <= n_out:
+        return np.arange(n)
+    y = np.asarray(y, dtype='float64')
+    change = np.flatnonzero(y[1:] != y[:-1])
+    edges = np.unique(np.concatenate([[0, n - 1], change, change + 1]))
+    if len(edges) <= n_out:
+        return edges
+
+    buckets = max(n_out // 4, 1)
+    bounds = np.linspace(0, n, buckets + 1).astype(int)
+    keep = []
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        if hi <= lo:
+            continue
+        segment = y[lo:hi]
+        keep.extend((lo, hi - 1, lo + int(np.argmin(segment)), lo + int(np.argmax(segment))))
+    return np.unique(keep)
+
+
+def downsample(x, y, n_out, method='minmax'):
+    """按指定方法（'minmax' 或 'lttb'）降采样，返回保留点的下标。"""
+    if method == 'lttb':
+        return lttb(x, y, n_out)
+    return minmax_steps(x, y, n_out)
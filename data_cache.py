@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import os
+import threading
+from types import MappingProxyType
+
+import pandas as pd
+
+# 进程级缓存：所有Streamlit会话共享同一份解析结果
+_LOCK = threading.Lock()
+_PARSE_LOCK = threading.RLock()
+_SIGNATURES = {}  # 绝对路径 -> (mtime_ns, size, sha1)
+_CACHE = {}       # (解析函数, 文件签名) -> 解析结果
+
+
+def _hash_file(path, chunk_size=1 << 20):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_signature(path):
+    """
+    返回文件签名 (绝对路径, mtime_ns, size, sha1)。
+    mtime和大小都未变化时复用上次的哈希，避免每次rerun都重新读取整个文件。
+    """
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    with _LOCK:
+        cached = _SIGNATURES.get(path)
+    if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+        digest = cached[2]
+    else:
+        digest = _hash_file(path)
+        with _LOCK:
+            _SIGNATURES[path] = (stat.st_mtime_ns, stat.st_size, digest)
+    return (path, stat.st_mtime_ns, stat.st_size, digest)
+
+
+def enable_copy_on_write():
+    """
+    开启pandas的Copy-on-Write模式（影响整个进程），由数据页面入口显式调用，不在导入时修改全局设置。
+    开启后缓存中的DataFrame以浅拷贝视图分发给各会话，任何会话对视图的修改（包括原地赋值）
+    都只作用于自己的副本，不会污染共享数据。
+    """
+    pd.set_option('mode.copy_on_write', True)
+
+
+def read_only_views(sheets):
+    """
+    返回 {name: DataFrame} 的只读映射，修改其中的DataFrame不会影响缓存。
+    已开启Copy-on-Write时为浅拷贝（只复制索引结构，写入时才复制数据）；
+    未开启时退回深拷贝，保证共享数据不被修改，与模块的导入顺序无关。
+    """
+    deep = pd.get_option('mode.copy_on_write') is not True
+    return MappingProxyType({name: df.copy(deep=deep) for name, df in sheets.items()})
+
+
+def load_cached(path, parser):
+    """
+    按文件签名缓存 parser(path) 的结果（进程级，所有会话共享）。
+    文件内容变化时才重新解析；同一文件的旧版本缓存会被清除。
+    """
+    signature = file_signature(path)
+    key = (getattr(parser, '__qualname__', repr(parser)),) + signature
+    with _LOCK:
+        result = _CACHE.get(key)
+    if result is not None:
+        return result
+
+    # 多个会话同时未命中时只解析一次
+    with _PARSE_LOCK:
+        with _LOCK:
+            result = _CACHE.get(key)
+        if result is None:
+            result = parser(path)
+            with _LOCK:
+                for old_key in [k for k in _CACHE if k[:2] == key[:2]]:
+                    del _CACHE[old_key]
+                _CACHE[key] = result
+    return result
+
+
+def _read_all_sheets(path):
+    with pd.ExcelFile(path) as xls:
+        return pd.read_excel(xls, sheet_name=None)
+
+
+def load_workbook(path):
+    """
+    读取Excel文件的所有工作表，按文件签名缓存在进程内。
+    返回只读映射 {sheet_name: DataFrame}，其中的DataFrame与缓存共享数据（写时复制）。
+    """
+    return read_only_views(load_cached(path, _read_all_sheets))
+
+
+def load_first_sheet(path):
+    """
+    读取Excel文件第一个工作表（共享缓存），等价于 pd.read_excel(path, sheet_name=0)。
+    """
+    sheets = load_workbook(path)
+    return next(iter(sheets.values()))
+
+
+def clear_cache():
+    """清空所有已缓存的解析结果。"""
+    with _LOCK:
+        _CACHE.clear()
+        _SIGNATURES.clear()
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+import fnmatch
+import hashlib
+import json
+import logging
+import os
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# 网关上传的读数文件（带时间戳的文件名，例如 pwsReadings_20260821T073518.xlsx）
+DROP_PATTERNS = ('*.xlsx', '*.csv')
+MANIFEST_NAME = 'manifest.jsonl'
+ARCHIVE_NAME = 'archive'
+QUARANTINE_NAME = 'quarantine'
+READING_COLUMNS = ['uploadTime', 'ID', 'SensorTotalLength', 'SensorCurrentLength']
+
+
+def _sha1(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_readings_file(path):
+    """
+    读取一个读数文件（xlsx或csv），返回列为 READING_COLUMNS 的DataFrame，uploadTime 解析为时间。
+    文件无法解析、缺少必需列或上传时间无法解析时抛出异常。
+    """
+    # ID 按文本读取，避免 001 被解析为数字 1
+    if path.lower().endswith('.csv'):
+        readings = pd.read_csv(path, dtype={'ID': str})
+    else:
+        readings = pd.read_excel(path, sheet_name=0, dtype={'ID': str})
+    missing = [col for col in READING_COLUMNS if col not in readings.columns]
+    if missing:
+        raise ValueError(f"missing columns: {', '.join(missing)}")
+    return readings[READING_COLUMNS].assign(uploadTime=pd.to_datetime(readings['uploadTime'], format='mixed'))
+
+
+class DropWatcher:
+    """
+    监视读数投放目录：
+    - 文件大小和修改时间在两次扫描间保持不变才认为上传完成；
+    - 一批连续上传的文件在目录安静下来（没有新文件出现）后合并为一次入库，
+      待处理文件达到 max_batch 时立即放行；
+    - 入库后先把文件内容哈希写入清单（manifest.jsonl），再移动到 archive 目录。
+      清单中已有的文件不会被再次入库，保证每个文件只处理一次；
+    - 无法解析的文件移动到 quarantine 目录并在清单中记录原因，不影响同一批的其他文件。
+    """
+    def __init__(self, drop_dir, max_batch=500):
+        self.drop_dir = drop_dir
+        self.archive_dir = os.path.join(drop_dir, ARCHIVE_NAME)
+        self.quarantine_dir = os.path.join(drop_dir, QUARANTINE_NAME)
+        self.manifest_path = os.path.join(drop_dir, MANIFEST_NAME)
+        self.max_batch = max_batch
+        self._last_scan = {}
+        os.makedirs(self.archive_dir, exist_ok=True)
+        os.makedirs(self.quarantine_dir, exist_ok=True)
+        self._processed = self._read_manifest()
+
+    def _read_manifest(self):
+        processed = set()
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        if not record.get('quarantined'):
+                            processed.add(record['sha1'])
+        return processed
+
+    def _scan(self):
+        found = {}
+        for entry in os.scandir(self.drop_dir):
+            if entry.is_file() and any(fnmatch.fnmatch(entry.name, p) for p in DROP_PATTERNS):
+                stat = entry.stat()
+                found[entry.path] = (stat.st_size, stat.st_mtime_ns)
+        return found
+
+    def collect(self):
+        """
+        扫描一次投放目录，返回可以入库的一批文件（按文件名排序），还在上传或仍有新文件到达时返回空列表。
+        """
+        scan = self._scan()
+        previous, self._last_scan = self._last_scan, scan
+        stable = sorted(path for path, stat in scan.items() if previous.get(path) == stat)
+        if not stable:
+            return []
+        # 本次扫描与上次完全相同说明这一波上传已经结束，否则等待下一次扫描再合并
+        if scan == previous or len(stable) >= self.max_batch:
+            return stable[:self.max_batch]
+        return []
+
+    def read_batch(self, paths):
+        """
+        读取一批文件，返回 (合并后的读数DataFrame, [(路径, sha1)])。
+        清单中已记录的文件不再读取，只会在 commit 时被归档；
+        无法读取的文件立即隔离（见 quarantine），不出现在返回的列表中。
+        """
+        frames, entries = [], []
+        for path in paths:
+            digest = _sha1(path)
+            if digest not in self._processed:
+                try:
+                    frames.append(read_readings_file(path))
+                except Exception as e:
+                    self.quarantine(path, digest, e)
+                    continue
+            entries.append((path, digest))
+        if not frames:
+            return pd.DataFrame(columns=READING_COLUMNS), entries
+        return pd.concat(frames, ignore_index=True), entries
+
+    def _write_manifest(self, records):
+        processed_at = pd.Timestamp.now().isoformat()
+        with open(self.manifest_path, 'a', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(dict(record, processed_at=processed_at)) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _move(self, path, digest, directory):
+        target = os.path.join(directory, os.path.basename(path))
+        if os.path.exists(target):
+            name, ext = os.path.splitext(os.path.basename(path))
+            target = os.path.join(directory, f"{name}.{digest[:8]}{ext}")
+        os.replace(path, target)
+        self._last_scan.pop(path, None)
+
+    def quarantine(self, path, digest, error):
+        """把无法读取的文件记录到清单（带错误信息）并移动到隔离目录，修复后可重新投放。"""
+        logger.warning("Quarantined %s: %s", path, error)
+        self._write_manifest([{
+            'file': os.path.basename(path),
+            'sha1': digest,
+            'quarantined': True,
+            'error': f"{type(error).__name__}: {error}",
+        }])
+        self._move(path, digest, self.quarantine_dir)
+
+    def commit(self, entries, rows_ingested=None):
+        """入库成功后调用：先写清单（fsync），再把文件移动到归档目录。"""
+        new_entries = [(path, digest) for path, digest in entries if digest not in self._processed]
+        if new_entries:
+            self._write_manifest([
+                {'file': os.path.basename(path), 'sha1': digest, 'batch_rows': rows_ingested}
+                for path, digest in new_entries
+            ])
+            self._processed.update(digest for _, digest in new_entries)
+        for path, digest in entries:
+            self._move(path, digest, self.archive_dir)
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+import io
+
+from PIL import Image
+
+from stat_cache import StatCache
+
+# 页面中图片的显示宽度（px）
+LOGO_WIDTH = 240            # st.logo 显示高度约32px，按2倍分辨率预留宽度
+SIDEBAR_LOGO_WIDTH = 120
+SIDEBAR_BANNER_WIDTH = 240
+CONTENT_WIDTH = 2 * 730     # width='stretch' 时Streamlit缩放到的最大宽度
+PNG_COLORS = 256
+
+# 进程级缓存：按 (源文件, 宽度) 保存缩放后的图片bytes
+_IMAGES = StatCache()
+
+
+def _render(path, width):
+    """缩放到显示宽度（不放大）并输出为体积尽量小的PNG或JPEG。"""
+    with Image.open(path) as image:
+        image.load()
+    if image.width > width:
+        height = max(round(image.height * width / image.width), 1)
+        image = image.resize((width, height), Image.LANCZOS)
+    # st.image 只原样发送PNG/JPEG/GIF，其他格式（如WebP）每次都会被重新编码为PNG，
+    # 因此透明图片输出为调色板PNG，不透明图片输出为JPEG
+    buffer = io.BytesIO()
+    if image.mode in ('RGBA', 'LA', 'P') and image.convert('RGBA').getextrema()[3][0] < 255:
+        image.convert('RGBA').quantize(PNG_COLORS, method=Image.Quantize.FASTOCTREE).save(
+            buffer, format='PNG', optimize=True)
+    else:
+        image.convert('RGB').save(buffer, format='JPEG', quality=85, optimize=True, progressive=True)
+    return buffer.getvalue()
+
+
+def asset_image(path, width=CONTENT_WIDTH):
+    """
+    返回按显示宽度预先缩放、压缩好的图片bytes（进程级缓存，所有会话共享）。
+    源文件的修改时间或大小变化时重新生成。直接传给 st.image / st.logo，
+    Streamlit按内容哈希分配媒体URL，浏览器可以缓存，重复rerun不再解码和缩放原图。
+    """
+    return _IMAGES.get(path, lambda source: _render(source, width), key=width)
@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+import argparse
+import asyncio
+import functools
+import json
+import logging
+import threading
+import urllib.request
+from io import StringIO
+
+import pandas as pd
+
+from sensor_ingest import ingest_latest
+from sensor_store import STORE_MODES, open_store
+
+logger = logging.getLogger(__name__)
+
+# 网关上传的读数列（与 pwsReadingsLatest.xlsx 相同）
+READING_COLUMNS = ['uploadTime', 'ID', 'SensorTotalLength', 'SensorCurrentLength']
+MAX_BODY_BYTES = 16 << 20
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+            411: 'Length Required', 413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+
+def parse_payload(body, content_type):
+    """
+    解析网关上传的一批读数，返回列为 READING_COLUMNS 的DataFrame。
+    JSON：读数对象列表，或 {"readings": [...]}；CSV：带表头的文本。
+    ID 按文本读取（001 不会变成 1），uploadTime 解析为时间，厚度列转换为数值。
+    内容无法解析、缺少必需列、某列的值无法转换或有缺失值（ID为空、没有厚度等）时
+    抛出 ValueError，整批不入库。
+    """
+    content_type = (content_type or '').split(';')[0].strip().lower()
+    text = body.decode('utf-8')
+    if content_type in ('text/csv', 'application/csv'):
+        readings = pd.read_csv(StringIO(text), dtype={'ID': str})
+    else:
+        payload = json.loads(text)
+        if isinstance(payload, dict):
+            payload = payload.get('readings', [payload])
+        readings = pd.DataFrame(payload)
+    missing = [col for col in READING_COLUMNS if col not in readings.columns]
+    if missing:
+        raise ValueError(f"missing columns: {', '.join(missing)}")
+    try:
+        columns = {
+            'uploadTime': pd.to_datetime(readings['uploadTime'], format='mixed'),
+            'SensorTotalLength': pd.to_numeric(readings['SensorTotalLength'], errors='raise'),
+            'SensorCurrentLength': pd.to_numeric(readings['SensorCurrentLength'], errors='raise'),
+        }
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"invalid value: {e}") from e
+    # 缺失的ID或厚度会生成 BDT-LLT-None 之类的传感器，或在唯一索引中被当作不同的读数重复写入
+    ids = readings['ID'].where(readings['ID'].isna(), readings['ID'].astype(str).str.strip())
+    columns['ID'] = ids.replace('', None)
+    readings = readings[READING_COLUMNS].assign(**columns)
+    incomplete = readings.isna().any(axis=1)
+    if incomplete.any():
+        rows = ', '.join(str(i) for i in readings.index[incomplete][:10])
+        raise ValueError(f"missing values in rows: {rows}")
+    return readings
+
+
+class IngestServer:
+    """
+    轻量的asyncio HTTP入库端点，网关直接上传读数，不必再生成Excel文件：
+      POST /readings  （application/json 或 text/csv）-> 写入传感器存储
+      GET  /health    -> 存活检查
+    每个请求处理完即关闭连接；入库在线程池中执行，不阻塞事件循环。
+    """
+    def __init__(self, store, host='127.0.0.1', port=8765):
+        self.store = store
+        self.host = host
+        self.port = port
+        self.thread = None  # start_in_thread 使用
+        self.loop = None
+        self._server = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        # port=0 时由系统分配端口
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info("Ingest endpoint listening on http://%s:%d", self.host, self.port)
+        return self
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        try:
+            status, payload = await self._dispatch(reader)
+        except Exception as e:
+            logger.exception("Ingest request failed")
+            status, payload = 500, {'error': str(e)}
+        body = json.dumps(payload).encode('utf-8')
+        writer.write(
+            f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: close\r\n\r\n".encode('ascii') + body
+        )
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def _dispatch(self, reader):
+        request_line = (await reader.readline()).decode('latin-1').split()
+        if len(request_line) < 2:
+            return 400, {'error': 'malformed request line'}
+        method, path = request_line[0].upper(), request_line[1].split('?')[0]
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode('latin-1')
+            if line in ('\r\n', '\n', ''):
+                break
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if path == '/health':
+            return (200, {'status': 'ok'}) if method == 'GET' else (405, {'error': 'use GET'})
+        if path != '/readings':
+            return 404, {'error': f'unknown path {path}'}
+        if method != 'POST':
+            return 405, {'error': 'use POST'}
+        if 'content-length' not in headers:
+            return 411, {'error': 'Content-Length required'}
+        try:
+            length = int(headers['content-length'])
+        except ValueError:
+            return 400, {'error': 'invalid Content-Length'}
+        if length < 0:
+            return 400, {'error': 'invalid Content-Length'}
+        if length > MAX_BODY_BYTES:
+            return 413, {'error': f'body larger than {MAX_BODY_BYTES} bytes'}
+        body = await reader.readexactly(length)
+
+        try:
+            readings = parse_payload(body, headers.get('content-type'))
+        except ValueError as e:
+            return 400, {'error': str(e)}
+        # 网关恢复连接后会补传积压的读数，不按高水位线过滤，重复读数由存储忽略
+        rows = await asyncio.get_running_loop().run_in_executor(
+            None, functools.partial(ingest_latest, readings, self.store, since_marks=False))
+        return 200, {'received': len(readings), 'ingested': len(rows)}
+
+
+def start_in_thread(store, host='127.0.0.1', port=0):
+    """
+    在后台线程中运行入库端点（例如与本地网关模拟器或脚本联调），返回已启动的 IngestServer。
+    port=0 时自动分配端口，可从返回值的 .port 读取；调用 stop_in_thread(server) 停止。
+    """
+    server = IngestServer(store, host, port)
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+
+    def run():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(server.start())
+        started.set()
+        loop.run_forever()
+
+    server.thread = threading.Thread(target=run, name="IngestServer", daemon=True)
+    server.loop = loop
+    server.thread.start()
+    started.wait()
+    return server
+
+
+def stop_in_thread(server):
+    """停止 start_in_thread 启动的入库端点。"""
+    future = asyncio.run_coroutine_threadsafe(server.close(), server.loop)
+    future.result()
+    server.loop.call_soon_threadsafe(server.loop.stop)
+    server.thread.join()
+
+
+def post_readings(url, readings, timeout=30):
+    """
+    以JSON上传一批读数（DataFrame或字典列表），返回服务器的JSON响应。
+    用于网关脚本或本地联调。
+    """
+    if isinstance(readings, pd.DataFrame):
+        readings = json.loads(readings.to_json(orient='records', date_format='iso'))
+    request = urllib.request.Request(
+        url,
+        data=json.dumps({'readings': readings}).encode('utf-8'),
+        headers={'Content-Type': 'application/json'},
+        method='POST'
+    )
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return json.loads(response.read())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="WearFusion gateway ingest endpoint")
+    parser.add_argument('--store', default="Boddington_pwsTray_Database.sqlite")
+    parser.add_argument('--seed', default="Boddington_pwsTray_Database_update.xlsx",
+                        help="workbook to import when the store is empty")
+    parser.add_argument('--mode', choices=STORE_MODES, default=None,
+                        help="storage mode for a new SQLite store (default: detect, else readings)")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    server = IngestServer(open_store(args.store, seed_file=args.seed, mode=args.mode),
+                          args.host, args.port)
+    asyncio.run(server.serve_forever())
+
+
+if __name__ == '__main__':
+    main()
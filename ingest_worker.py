@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+import logging
+import os
+import threading
+from collections import namedtuple
+from types import MappingProxyType
+
+from data_cache import file_signature, load_first_sheet
+from drop_watcher import DropWatcher
+from sensor_ingest import ingest_latest
+
+logger = logging.getLogger(__name__)
+
+# 已发布的数据快照：版本号 + 只读的预计算结果。所有会话引用同一个快照对象，
+# 其中的DataFrame在Copy-on-Write模式下共享（见 data_cache.enable_copy_on_write），会话内的修改只会复制自己的那一份
+DataSnapshot = namedtuple('DataSnapshot', ['version', 'data'])
+
+
+def freeze(data):
+    """把 build() 返回的字典（包括嵌套字典）转换为只读映射。"""
+    if isinstance(data, dict):
+        return MappingProxyType({key: freeze(value) for key, value in data.items()})
+    return data
+
+
+class IngestWorker(threading.Thread):
+    """
+    后台入库线程，与Streamlit页面渲染解耦：
+    定时检查最新读数文件和投放目录 drop_dir（见 DropWatcher），有新读数时增量入库；
+    数据版本变化时调用 build(view, latest_df) 预计算页面需要的聚合结果，
+    并以递增的版本号发布。页面渲染只读取已发布的结果。
+    view 为页面读取的存储视图（例如 CalibratedStore），默认就是 store；
+    新读数写入 store，是否重新计算按 view.version() 判断。
+    """
+    def __init__(self, store, latest_file, build, interval=10.0, drop_dir=None, view=None):
+        super().__init__(name=f"IngestWorker({os.path.basename(store.path)})", daemon=True)
+        self.store = store
+        self.view = store if view is None else view
+        self.latest_file = latest_file
+        self.build = build
+        self.interval = interval
+        self.last_error = None
+        self._stop_event = threading.Event()
+        self._published = DataSnapshot(0, None)
+        self._published_changed = threading.Condition()
+        self._latest_signature = None
+        self._latest_df = None
+        self._store_version = None
+        self.watcher = DropWatcher(drop_dir) if drop_dir else None
+        # 第一次同步执行，保证启动后立即有可用的结果
+        self.poll_once()
+
+    @property
+    def version(self):
+        """已发布结果的版本号（每次数据变化加1）。"""
+        return self._published.version
+
+    def snapshot(self):
+        """
+        返回当前的 DataSnapshot(版本号, 预计算结果)，结果为 build() 返回值的只读映射。
+        快照发布后不再改变，会话只需保存视图参数（选中的传感器、时间窗口等），不保存数据。
+        """
+        return self._published
+
+    def wait_for_version(self, version, timeout=None):
+        """等待发布版本号超过 version，返回最新的版本号。"""
+        with self._published_changed:
+            self._published_changed.wait_for(lambda: self.version > version, timeout)
+        return self.version
+
+    def poll_once(self):
+        """检查一次最新读数文件和存储版本，必要时入库并重新计算发布。"""
+        try:
+            if os.path.exists(self.latest_file):
+                signature = file_signature(self.latest_file)
+                if signature != self._latest_signature:
+                    self._latest_df = load_first_sheet(self.latest_file)
+                    rows = ingest_latest(self._latest_df, self.store, view=self.view)
+                    self._latest_signature = signature
+                    if not rows.empty:
+                        logger.info("Ingested %d readings from %s", len(rows), self.latest_file)
+
+            if self.watcher is not None:
+                batch = self.watcher.collect()
+                if batch:
+                    readings, entries = self.watcher.read_batch(batch)
+                    # 投放的文件可能是补传的积压数据，不按高水位线过滤，重复读数由存储忽略
+                    rows = ingest_latest(readings, self.store, since_marks=False, view=self.view)
+                    self.watcher.commit(entries, len(rows))
+                    if not readings.empty:
+                        self._latest_df = readings
+                    logger.info("Ingested %d readings from %d dropped files", len(rows), len(batch))
+
+            store_version = self.view.version()
+            if store_version != self._store_version or self._published.data is None:
+                data = self.build(self.view, self._latest_df)
+                self._store_version = store_version
+                with self._published_changed:
+                    self._published = DataSnapshot(self._published.version + 1, freeze(data))
+                    self._published_changed.notify_all()
+            self.last_error = None
+        except Exception as e:  # 后台线程不能退出，记录错误后下次继续
+            logger.exception("Ingest poll failed")
+            self.last_error = e
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self.poll_once()
+
+    def stop(self):
+        self._stop_event.set()
@@ -1,37 +1,70 @@
+import importlib
 import streamlit as st
 
+from image_assets import asset_image, LOGO_WIDTH, SIDEBAR_LOGO_WIDTH, SIDEBAR_BANNER_WIDTH
+
+# 导航控件的session_state键，值为当前页面标题
+NAV_KEY = 'multipage_page'
+
+
+def load_page(func):
+    """
+    返回页面函数。func 可以是函数，也可以是 "模块:函数" 字符串（省略函数名时为 app），
+    字符串形式的页面在第一次被选中时才导入模块，之后由 sys.modules 缓存。
+    """
+    if callable(func):
+        return func
+    module_name, _, attr = func.partition(':')
+    return getattr(importlib.import_module(module_name), attr or 'app')
+
+
+def navigate_to(title):
+    """
+    切换到指定标题的页面（例如从车队总览钻取到单个资产）。
+    需在控件回调（on_click/on_change/on_select）中调用，下一次rerun时生效。
+    """
+    st.session_state[NAV_KEY] = title
+
+
 class MultiPage:
     """Framework for combining multiple streamlit applications
+    Pages are functions or "module:function" paths; path pages are imported lazily,
+    only when they are selected, so unused pages cost nothing at startup.
     """
     def __init__(self) -> None:
         self.pages = []
     
-    def add_page(self, title, func):
+    def add_page(self, title, func, *args):
         self.pages.append(
             {
             'title': title,
-            'function': func
+            'function': func,
+            'args': args
             }
         )
     
     def run(self):
         #st.sidebar.title("Grind Master")
-        page = st.logo("bisalloy.png")
-        page = st.sidebar.image("amman.png", width=120)
+        # 图片按显示宽度预先缩放并缓存在进程内，每次rerun不再发送和缩放原图
+        page = st.logo(asset_image("bisalloy.png", LOGO_WIDTH))
+        page = st.sidebar.image(asset_image("amman.png", SIDEBAR_LOGO_WIDTH), width=SIDEBAR_LOGO_WIDTH)
         #page = st.sidebar.header("Schlam Smart Tray Monitoring")
         page = st.sidebar.header(":rainbow[Bisalloy Digital Solutions]")
         page = st.sidebar.header(":rainbow[WearFusion]")
-        page = st.sidebar.image("mill.png", width=240)
+        page = st.sidebar.image(asset_image("mill.png", SIDEBAR_BANNER_WIDTH), width=SIDEBAR_BANNER_WIDTH)
         page = st.sidebar.header("***Next Gen Truck Tray Intelligence***", divider='gray')
         page = st.sidebar.markdown("###")
-        page = st.sidebar.radio(
+        titles = [page['title'] for page in self.pages]
+        if st.session_state.get(NAV_KEY) not in titles:
+            st.session_state.pop(NAV_KEY, None)
+        title = st.sidebar.radio(
             'Asset Navigation', 
-            self.pages,
-            format_func=lambda page: page['title']  # Function to modify the display of the labels.
-
+            titles,
+            key=NAV_KEY
         )
+        page = self.pages[titles.index(title)]
         
-        page['function']()
+        load_page(page['function'])(*page['args'])
         page = st.sidebar.markdown("###")
         page = st.sidebar.markdown("###")
         page = st.sidebar.markdown("###")
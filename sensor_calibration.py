@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+import threading
+
+import numpy as np
+import yaml
+from yaml.loader import SafeLoader
+
+from data_cache import load_cached, read_only_views
+from sensor_runs import load_runs
+
+CALIBRATION_FILE = "calibration.yaml"
+# 需要校准的厚度列；Wear 由校准后的厚度重新计算
+THICKNESS_COLUMNS = ['InitialThickness', 'CurrentThickness']
+
+
+class CalibrationTable:
+    """
+    传感器厚度校准表：corrected = raw * scale + offset。
+    default 适用于表中没有单独配置的传感器；version 为校准表的版本号，
+    修改系数时递增，导出文件和缓存据此区分新旧校准结果。
+    """
+    def __init__(self, version=0, default=None, sensors=None):
+        self.version = version
+        self.default = _coefficients(default or {})
+        self.sensors = {name: _coefficients(conf or {}) for name, conf in (sensors or {}).items()}
+
+    @classmethod
+    def from_config(cls, config):
+        config = config or {}
+        return cls(config.get('version', 0), config.get('default'), config.get('sensors'))
+
+    @property
+    def key(self):
+        """标识校准内容的键（版本号和全部系数），用于缓存。"""
+        return (self.version, self.default, tuple(sorted(self.sensors.items())))
+
+    def coefficients(self, sensor):
+        """该传感器的 (scale, offset)。"""
+        return self.sensors.get(sensor, self.default)
+
+    def coefficient_arrays(self, sensors):
+        """每个传感器的校准系数数组 (scale, offset)，与 sensors 等长，用于向量化换算。"""
+        pairs = np.array([self.coefficients(sensor) for sensor in sensors], dtype='float64').reshape(-1, 2)
+        return pairs[:, 0], pairs[:, 1]
+
+    def apply(self, df, sensor):
+        """返回校准后的DataFrame（不修改原DataFrame），厚度列一次向量化换算。"""
+        scale, offset = self.coefficients(sensor)
+        if (scale, offset) == (1.0, 0.0) or df.empty:
+            return df
+        corrected = {col: df[col].to_numpy(dtype='float64') * scale + offset
+                     for col in THICKNESS_COLUMNS if col in df.columns}
+        if 'Wear' in df.columns:
+            corrected['Wear'] = corrected['InitialThickness'] - corrected['CurrentThickness']
+        return df.assign(**corrected)
+
+    def apply_frames(self, frames):
+        """对 {sensor: DataFrame} 中的每个传感器应用校准，返回新的字典。"""
+        return {name: self.apply(df, name) for name, df in frames.items()}
+
+    def apply_rows(self, rows):
+        """对带 Sheet 列的长表（例如增量入库的新行）按各行的传感器应用校准，返回新的DataFrame。"""
+        if rows.empty:
+            return rows
+        scale, offset = self.coefficient_arrays(rows['Sheet'])
+        corrected = {col: rows[col].to_numpy(dtype='float64') * scale + offset
+                     for col in THICKNESS_COLUMNS if col in rows.columns}
+        if 'Wear' in rows.columns:
+            corrected['Wear'] = corrected['InitialThickness'] - corrected['CurrentThickness']
+        return rows.assign(**corrected)
+
+
+def _coefficients(conf):
+    return (float(conf.get('scale', 1.0)), float(conf.get('offset', 0.0)))
+
+
+def _parse_calibration(path):
+    with open(path, encoding='utf-8') as f:
+        return CalibrationTable.from_config(yaml.load(f, Loader=SafeLoader))
+
+
+def load_calibration(path=CALIBRATION_FILE):
+    """读取校准表（按文件签名缓存，文件修改后自动重新读取）；文件不存在时不做校准。"""
+    try:
+        return load_cached(path, _parse_calibration)
+    except FileNotFoundError:
+        return CalibrationTable()
+
+
+class CalibratedStore:
+    """
+    存储的只读校准视图：load()/load_runs() 返回校准后的厚度，按
+    (存储数据版本, 校准内容) 缓存，每个数据版本只换算一次。
+    状态、绘图、台阶索引、预测和导出都读取这个视图，存储中保留原始读数。
+    """
+    def __init__(self, store, calibration_file=CALIBRATION_FILE):
+        self.store = store
+        self.calibration_file = calibration_file
+        # 与原始存储区分缓存（台阶索引、长表、导出文件等按 path 缓存）；
+        # 入库时通过 ingest_latest(..., view=本视图) 按校准后的厚度增量更新台阶索引
+        self.path = f"{store.path}#calibrated"
+        self._lock = threading.Lock()
+        self._cached = (None, None)
+        self._runs_cached = (None, None)
+
+    def calibration(self):
+        return load_calibration(self.calibration_file)
+
+    def version(self):
+        return (self.store.version(), self.calibration().key)
+
+    def sensor_names(self):
+        return list(self.load())
+
+    def calibrate_rows(self, rows):
+        """把写入原始存储的新行（带 Sheet 列）换算为本视图中的厚度，用于增量更新台阶索引等。"""
+        return self.calibration().apply_rows(rows)
+
+    def load(self):
+        version = self.version()
+        with self._lock:
+            cached_version, frames = self._cached
+        if cached_version != version:
+            frames = self.calibration().apply_frames(self.store.load())
+            with self._lock:
+                self._cached = (version, frames)
+        return read_only_views(frames)
+
+    def load_runs(self):
+        version = self.version()
+        with self._lock:
+            cached_version, runs = self._runs_cached
+        if cached_version != version:
+            runs = self.calibration().apply_frames(load_runs(self.store))
+            with self._lock:
+                self._runs_cached = (version, runs)
+        return read_only_views(runs)
@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import os
+import tempfile
+import threading
+import zipfile
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+from sensor_store import DB_COLUMNS
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow为可选依赖，没有时不提供Parquet导出
+    pa = pq = None
+
+# 格式 -> (扩展名, MIME类型, 显示名称)
+EXPORT_FORMATS = {
+    'xlsx': ('.xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', "Excel Workbook"),
+    'csv': ('.csv', 'text/csv', "CSV (all sensors)"),
+    'zip': ('.zip', 'application/zip', "Zipped CSV (one file per sensor)"),
+    'parquet': ('.parquet', 'application/vnd.apache.parquet', "Parquet"),
+}
+EXPORT_DIR = os.path.join(tempfile.gettempdir(), 'wearfusion_exports')
+CHUNK_ROWS = 50000
+CHUNK_BYTES = 1 << 20
+EXCEL_MAX_ROWS = 1048575  # Excel每个工作表最多1048576行（含表头），超出部分分到下一个工作表
+MAX_ARTIFACTS = 16
+
+# 进程级导出缓存：(存储路径, 格式, 过滤条件) -> (数据版本, 文件路径)，所有会话共享同一个文件
+_ARTIFACTS = {}
+_LOCK = threading.Lock()
+_BUILD_LOCK = threading.Lock()
+
+
+def available_formats():
+    """当前环境可用的导出格式（没有pyarrow时不含parquet）。"""
+    return [fmt for fmt in EXPORT_FORMATS if fmt != 'parquet' or pq is not None]
+
+
+def filtered_frames(store, sensors=None, start=None, end=None):
+    """
+    逐个传感器产出 (sensor, DataFrame)，按传感器和扫描时间范围 [start, end] 过滤。
+    存储中的数据已按扫描时间排序，时间过滤用二分查找切片，不复制数据。
+    """
+    for name, df in store.load().items():
+        if sensors is not None and name not in sensors:
+            continue
+        if start is not None or end is not None:
+            scan_time = df['SensorScanTime'].to_numpy('datetime64[ns]')
+            lo = 0 if start is None else np.searchsorted(scan_time, pd.Timestamp(start).to_datetime64(), 'left')
+            hi = len(df) if end is None else np.searchsorted(scan_time, pd.Timestamp(end).to_datetime64(), 'right')
+            df = df.iloc[lo:hi]
+        yield name, df
+
+
+def _chunks(df, rows=CHUNK_ROWS):
+    for lo in range(0, len(df), rows):
+        yield df.iloc[lo:lo + rows]
+
+
+class _ChunkSink:
+    """
+    只追加的输出缓冲：写入的数据在每次 drain() 时被取走，内存中只保留最近一个分块。
+    不支持seek，zipfile/pyarrow会按流式方式写出。
+    """
+    def __init__(self):
+        self._parts = []
+        self._size = 0
+        self.closed = False
+
+    def write(self, data):
+        data = bytes(data)
+        self._parts.append(data)
+        self._size += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._size
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self._parts)
+        self._parts = []
+        return data
+
+
+def iter_csv(frames):
+    """所有传感器合并为一个CSV（首列为 Sensor），按分块产出bytes。"""
+    header = True
+    for name, df in frames:
+        for chunk in _chunks(df):
+            yield chunk.assign(Sensor=name)[['Sensor'] + DB_COLUMNS].to_csv(index=False, header=header).encode('utf-8')
+            header = False
+    if header:
+        yield (','.join(['Sensor'] + DB_COLUMNS) + '\n').encode('utf-8')
+
+
+def iter_zip(frames):
+    """每个传感器一个CSV文件，打包为zip，按分块产出bytes。"""
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+        for name, df in frames:
+            with zf.open(f"{name}.csv", 'w', force_zip64=True) as member:
+                member.write((','.join(DB_COLUMNS) + '\n').encode('utf-8'))
+                for chunk in _chunks(df):
+                    member.write(chunk[DB_COLUMNS].to_csv(index=False, header=False).encode('utf-8'))
+                    yield sink.drain()
+    yield sink.drain()
+
+
+def iter_parquet(frames):
+    """所有传感器合并为一个Parquet文件（首列为 Sensor），每个分块一个row group。"""
+    if pq is None:
+        raise RuntimeError("Parquet export requires pyarrow")
+    sink = _ChunkSink()
+    writer = None
+    for name, df in frames:
+        for chunk in _chunks(df):
+            table = pa.Table.from_pandas(chunk.assign(Sensor=name)[['Sensor'] + DB_COLUMNS], preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(sink, table.schema)
+            writer.write_table(table.cast(writer.schema))
+            yield sink.drain()
+    if writer is None:
+        empty = pd.DataFrame({
+            'Sensor': pd.Series(dtype='object'),
+            'ServerUpdateTime': pd.Series(dtype='datetime64[ns]'),
+            'SensorScanTime': pd.Series(dtype='datetime64[ns]'),
+            'InitialThickness': pd.Series(dtype='float64'),
+            'CurrentThickness': pd.Series(dtype='float64'),
+            'Wear': pd.Series(dtype='float64'),
+        })
+        writer = pq.ParquetWriter(sink, pa.Table.from_pandas(empty, preserve_index=False).schema)
+    writer.close()
+    yield sink.drain()
+
+
+def iter_xlsx(frames):
+    """
+    每个传感器一个工作表的Excel工作簿。使用openpyxl只写模式逐行写出，
+    超过Excel行数上限的传感器拆分到 name_2、name_3 ... 工作表。
+    """
+    wb = openpyxl.Workbook(write_only=True)
+    for name, df in frames:
+        for part, lo in enumerate(range(0, max(len(df), 1), EXCEL_MAX_ROWS)):
+            ws = wb.create_sheet(name if part == 0 else f"{name}_{part + 1}"[-31:])
+            ws.append(DB_COLUMNS)
+            for chunk in _chunks(df.iloc[lo:lo + EXCEL_MAX_ROWS]):
+                values = chunk[DB_COLUMNS].astype(object)
+                for row in values.where(chunk[DB_COLUMNS].notna(), None).itertuples(index=False):
+                    ws.append(row)
+    if not wb.worksheets:
+        wb.create_sheet('Sheet1').append(DB_COLUMNS)
+    with tempfile.TemporaryFile() as tmp:
+        wb.save(tmp)
+        tmp.seek(0)
+        yield from iter(lambda: tmp.read(CHUNK_BYTES), b'')
+
+
+_WRITERS = {
+    'xlsx': iter_xlsx,
+    'csv': iter_csv,
+    'zip': iter_zip,
+    'parquet': iter_parquet,
+}
+
+
+def iter_export(store, fmt='xlsx', sensors=None, start=None, end=None):
+    """按指定格式和过滤条件流式生成导出文件，逐块产出bytes。"""
+    return _WRITERS[fmt](filtered_frames(store, sensors, start, end))
+
+
+def write_export(store, target, fmt='xlsx', sensors=None, start=None, end=None):
+    """把导出文件流式写到路径 target，返回写入的字节数。"""
+    size = 0
+    with open(target, 'wb') as f:
+        for data in iter_export(store, fmt, sensors, start, end):
+            f.write(data)
+            size += len(data)
+    return size
+
+
+def _artifact_key(store, fmt, sensors, start, end):
+    sensors = None if sensors is None else tuple(sorted(sensors))
+    start = None if start is None else pd.Timestamp(start)
+    end = None if end is None else pd.Timestamp(end)
+    return (store.path, fmt, sensors, start, end)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def export_artifact(store, fmt='xlsx', build=False, sensors=None, start=None, end=None):
+    """
+    返回当前数据版本导出文件的路径（生成在临时目录，所有会话共享）。
+    缓存中有当前版本时直接返回；build=True 或同样的导出曾经生成过（数据已更新）时
+    重新流式生成；否则返回None，不做任何序列化。
+    """
+    key = _artifact_key(store, fmt, sensors, start, end)
+    version = store.version()
+    with _LOCK:
+        cached = _ARTIFACTS.get(key)
+    if cached is not None and cached[0] == version and os.path.exists(cached[1]):
+        return cached[1]
+    if not build and cached is None:
+        return None
+
+    # 多个会话同时请求时只生成一次
+    with _BUILD_LOCK:
+        with _LOCK:
+            cached = _ARTIFACTS.get(key)
+        if cached is not None and cached[0] == version and os.path.exists(cached[1]):
+            return cached[1]
+        os.makedirs(EXPORT_DIR, exist_ok=True)
+        digest = hashlib.sha1(repr((key, version)).encode('utf-8')).hexdigest()[:16]
+        path = os.path.join(EXPORT_DIR, f"{digest}{EXPORT_FORMATS[fmt][0]}")
+        write_export(store, path, fmt, sensors, start, end)
+        with _LOCK:
+            stale = [_ARTIFACTS[key][1]] if key in _ARTIFACTS else []
+            _ARTIFACTS[key] = (version, path)
+            # 只保留最近生成的若干个导出文件
+            while len(_ARTIFACTS) > MAX_ARTIFACTS:
+                stale.append(_ARTIFACTS.pop(next(iter(_ARTIFACTS)))[1])
+    for old_path in stale:
+        if old_path != path:
+            _remove(old_path)
+    return path
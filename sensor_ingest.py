@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+import threading
+
+import pandas as pd
+
+from sensor_store import dedupe_readings
+from thickness_steps import update_step_index
+
+# 最新读数文件中的ID（如 01C）加上前缀即为数据库工作表名（BDT-LLT-01C）
+SENSOR_PREFIX = "BDT-LLT-"
+SCAN_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+_INGEST_LOCK = threading.Lock()
+
+
+def sensor_sheet_name(sensor_id, prefix=SENSOR_PREFIX):
+    """
+    将最新读数文件中的传感器ID映射为数据库工作表名，例如 01C -> BDT-LLT-01C。
+    已带前缀的ID原样返回。
+    """
+    sensor_id = str(sensor_id).strip()
+    if sensor_id.startswith(prefix):
+        return sensor_id
+    return f"{prefix}{sensor_id}"
+
+
+def latest_to_db_rows(latest_df, server_time=None):
+    """
+    把最新读数（uploadTime, ID, SensorTotalLength, SensorCurrentLength）
+    转换为数据库行格式，额外带一列 Sheet 表示目标工作表。
+    """
+    if server_time is None:
+        server_time = pd.Timestamp.now()
+    scan_time = pd.to_datetime(latest_df['uploadTime'])
+    rows = pd.DataFrame({
+        'Sheet': latest_df['ID'].map(sensor_sheet_name),
+        'ServerUpdateTime': server_time,
+        'SensorScanTime': scan_time.dt.strftime(SCAN_TIME_FORMAT),
+        'InitialThickness': latest_df['SensorTotalLength'],
+        'CurrentThickness': latest_df['SensorCurrentLength'],
+        'Wear': latest_df['SensorTotalLength'] - latest_df['SensorCurrentLength'],
+    })
+    return rows[scan_time.notna().to_numpy()]
+
+
+def select_new_rows(rows, marks):
+    """
+    只保留扫描时间晚于对应工作表高水位线的行；工作表不存在或为空时全部保留。
+    """
+    scan_time = pd.to_datetime(rows['SensorScanTime'])
+    mark = pd.to_datetime(rows['Sheet'].map(marks))
+    keep = mark.isna() | (scan_time > mark)
+    return rows[keep.to_numpy()]
+
+
+def ingest_latest(latest_df, store, since_marks=True, view=None):
+    """
+    增量入库：把最新读数去重后追加到存储中，并同步更新厚度台阶索引。
+    since_marks=True 时只保留比各传感器高水位线更新的行（最新读数文件每次包含全部传感器的
+    当前读数，过滤后写入量最小）；since_marks=False 时不按高水位线过滤，用于网关恢复连接后
+    补传的积压文件等可能早于已有读数的批次，重复读数由存储按 (传感器, 扫描时间, 当前厚度) 忽略。
+    store 为 sensor_store 中的存储对象；view 为页面读取的视图（例如 CalibratedStore，
+    需提供 calibrate_rows），台阶索引按视图的路径和厚度更新，默认就是 store。
+    返回本次提交给存储的行。
+    """
+    view = store if view is None else view
+    with _INGEST_LOCK:
+        rows = latest_to_db_rows(latest_df)
+        if since_marks:
+            rows = select_new_rows(rows, store.high_water_marks())
+        rows = dedupe_readings(rows)
+        previous_version = view.version()
+        store.append(rows)
+        if not rows.empty:
+            index_rows = rows if view is store else view.calibrate_rows(rows)
+            update_step_index(view, index_rows, previous_version)
+    return rows
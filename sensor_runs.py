@@ -0,0 +1,324 @@
+# -*- coding: utf-8 -*-
+import argparse
+from bisect import bisect_right
+
+import numpy as np
+import pandas as pd
+
+from data_cache import read_only_views
+from sensor_store import DB_COLUMNS, SQLiteStore, dedupe_readings, import_workbook, to_epoch_ns, to_floats
+
+# 游程（状态段）列：厚度不变的一段连续读数只记录首末时间和心跳次数
+RUN_COLUMNS = [
+    "ServerUpdateTime",
+    "InitialThickness",
+    "CurrentThickness",
+    "FirstSeen",
+    "LastSeen",
+    "Heartbeats"
+]
+
+
+def encode_runs(df):
+    """
+    把单个传感器的读数压缩为游程：CurrentThickness（或InitialThickness）变化时开始新的一段。
+    返回列为 RUN_COLUMNS 的DataFrame，按 FirstSeen 排序。
+    """
+    if df.empty:
+        return pd.DataFrame({
+            "ServerUpdateTime": pd.Series(dtype='datetime64[ns]'),
+            "InitialThickness": pd.Series(dtype='float64'),
+            "CurrentThickness": pd.Series(dtype='float64'),
+            "FirstSeen": pd.Series(dtype='datetime64[ns]'),
+            "LastSeen": pd.Series(dtype='datetime64[ns]'),
+            "Heartbeats": pd.Series(dtype='int64'),
+        })
+    df = df.assign(SensorScanTime=pd.to_datetime(df['SensorScanTime'], format='mixed'))
+    df = df.sort_values('SensorScanTime', kind='stable')
+    value = df[['InitialThickness', 'CurrentThickness']]
+    run_id = value.ne(value.shift()).any(axis=1).cumsum().to_numpy()
+    runs = df.groupby(run_id, sort=False).agg(
+        ServerUpdateTime=('ServerUpdateTime', 'last'),
+        InitialThickness=('InitialThickness', 'first'),
+        CurrentThickness=('CurrentThickness', 'first'),
+        FirstSeen=('SensorScanTime', 'min'),
+        LastSeen=('SensorScanTime', 'max'),
+        Heartbeats=('SensorScanTime', 'size'),
+    )
+    return runs.reset_index(drop=True)
+
+
+def expand_runs(runs):
+    """
+    把游程展开回逐条读数（列为 DB_COLUMNS）。每段的首末时间是精确值，
+    中间的心跳按首末时间等间隔还原。
+    """
+    counts = runs['Heartbeats'].to_numpy('int64')
+    owner = np.repeat(np.arange(len(runs)), counts)
+    position = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    steps = np.maximum(counts - 1, 1)[owner]
+    first = runs['FirstSeen'].to_numpy('datetime64[ns]').view('int64')[owner]
+    last = runs['LastSeen'].to_numpy('datetime64[ns]').view('int64')[owner]
+    scan_time = first + (last - first) * position // steps
+    initial = runs['InitialThickness'].to_numpy()[owner]
+    current = runs['CurrentThickness'].to_numpy()[owner]
+    return pd.DataFrame({
+        'ServerUpdateTime': runs['ServerUpdateTime'].to_numpy()[owner],
+        'SensorScanTime': scan_time.view('datetime64[ns]'),
+        'InitialThickness': initial,
+        'CurrentThickness': current,
+        'Wear': initial - current,
+    })
+
+
+def runs_to_steps(runs):
+    """
+    游程转为绘图用的台阶点：每段只保留首次和末次出现两个点（列为 DB_COLUMNS）。
+    只有一次心跳的段只保留一个点。
+    """
+    edges = pd.concat([
+        runs.assign(SensorScanTime=runs['FirstSeen']),
+        runs[runs['Heartbeats'] > 1].assign(SensorScanTime=runs['LastSeen']),
+    ])
+    edges = edges.sort_values('SensorScanTime', kind='stable').reset_index(drop=True)
+    return edges.assign(Wear=edges['InitialThickness'] - edges['CurrentThickness'])[DB_COLUMNS]
+
+
+def load_runs(store):
+    """
+    返回 {sensor: 游程DataFrame}。RunLengthStore（以及校准视图等提供 load_runs 的存储）
+    直接读取游程，其他存储从逐条读数现场压缩。
+    """
+    if hasattr(store, 'load_runs'):
+        return store.load_runs()
+    return {name: encode_runs(df) for name, df in store.load().items()}
+
+
+def _split_run(run, scan):
+    """
+    在 scan 处把游程 [rowid, initial, current, first, last, heartbeats, server_time] 拆成前后两段。
+    中间心跳的时间没有记录，按首末时间等间隔的位置（与 expand_runs 相同）分配到两段：
+    前段保留原 rowid 和首次时间，后段为新游程并保留末次时间。
+    """
+    first, last, heartbeats = run[3], run[4], run[5]
+    step = lambda k: first + (last - first) * k // (heartbeats - 1)
+    k = (scan - first) * (heartbeats - 1) // (last - first)
+    while k + 1 < heartbeats and step(k + 1) <= scan:
+        k += 1
+    while k > 0 and step(k) > scan:
+        k -= 1
+    head = [run[0], run[1], run[2], first, step(k), k + 1, run[6]]
+    tail = [None, run[1], run[2], step(k + 1), last, heartbeats - k - 1, run[6]]
+    return head, tail
+
+
+# ------------------ SQLite 游程存储 ------------------
+_RUNS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    sensor TEXT NOT NULL,
+    server_update_time INTEGER,
+    initial_thickness REAL,
+    current_thickness REAL,
+    first_seen INTEGER NOT NULL,
+    last_seen INTEGER NOT NULL,
+    heartbeats INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_runs_sensor_first ON runs (sensor, first_seen);
+"""
+
+
+class RunLengthStore(SQLiteStore):
+    """
+    紧凑存储模式：只记录厚度变化（游程）及其首末时间和心跳次数。
+    被动式传感器绝大多数读数与上一条相同，存储量可减少几个数量级；
+    load() 按需展开为逐条读数，load_runs() 直接返回游程。
+    append() 的读数通常晚于该传感器已有的最新时间，只需延长或新增末尾的游程；
+    补传的较早读数只拆分或延长所在位置的游程（见 _backfill），其他游程保持不变。
+    """
+    def __init__(self, path):
+        super().__init__(path)
+        self._runs_cached = (None, None)
+        with self._connect() as conn:
+            conn.executescript(_RUNS_SCHEMA)
+
+    def load_runs(self):
+        version = self.version()
+        with self._lock:
+            cached_version, runs = self._runs_cached
+            if cached_version != version:
+                runs = self._read_runs()
+                self._runs_cached = (version, runs)
+        return read_only_views(runs)
+
+    @staticmethod
+    def _query_runs(conn, where="", params=()):
+        """查询游程表，返回带 sensor 列和 RUN_COLUMNS 的类型化DataFrame。"""
+        table = pd.read_sql_query(
+            "SELECT sensor, server_update_time, initial_thickness, current_thickness,"
+            f" first_seen, last_seen, heartbeats FROM runs {where} ORDER BY sensor, first_seen, rowid",
+            conn,
+            params=params,
+            dtype={'server_update_time': 'Int64', 'first_seen': 'int64',
+                   'last_seen': 'int64', 'heartbeats': 'int64'},
+        )
+        return pd.DataFrame({
+            'sensor': table['sensor'],
+            'ServerUpdateTime': pd.to_datetime(table['server_update_time'], unit='ns'),
+            'InitialThickness': table['initial_thickness'].astype('float64'),
+            'CurrentThickness': table['current_thickness'].astype('float64'),
+            'FirstSeen': pd.to_datetime(table['first_seen'], unit='ns'),
+            'LastSeen': pd.to_datetime(table['last_seen'], unit='ns'),
+            'Heartbeats': table['heartbeats'],
+        })
+
+    def _read_runs(self):
+        with self._connect() as conn:
+            names = [name for (name,) in conn.execute("SELECT name FROM sensors ORDER BY position")]
+            table = self._query_runs(conn)
+        groups = {
+            name: df.drop(columns='sensor').reset_index(drop=True)
+            for name, df in table.groupby('sensor', sort=False)
+        }
+        empty = table[RUN_COLUMNS].iloc[:0]
+        return {name: groups.get(name, empty) for name in names}
+
+    def _read_frames(self):
+        return {name: expand_runs(runs) for name, runs in self._read_runs().items()}
+
+    def high_water_marks(self):
+        with self._connect() as conn:
+            names = [name for (name,) in conn.execute("SELECT name FROM sensors ORDER BY position")]
+            marks = dict(conn.execute("SELECT sensor, MAX(last_seen) FROM runs GROUP BY sensor"))
+        return {name: pd.Timestamp(marks[name]) if name in marks else pd.NaT for name in names}
+
+    def append(self, rows):
+        """
+        追加读数：与该传感器最后一段厚度相同的读数只延长该段，其余生成新段。
+        不晚于该传感器最新时间的读数（补传的积压数据）交给 _backfill 合并。
+        """
+        rows = dedupe_readings(rows)
+        if rows.empty:
+            return
+        with self._connect() as conn:
+            self._add_sensors(conn, pd.unique(rows['Sheet']))
+            for sensor, sensor_rows in rows.groupby('Sheet', sort=False):
+                mark = conn.execute("SELECT MAX(last_seen) FROM runs WHERE sensor = ?", (sensor,)).fetchone()[0]
+                if mark is not None:
+                    late = np.array(to_epoch_ns(sensor_rows['SensorScanTime']), dtype='int64') <= mark
+                    if late.any():
+                        self._backfill(conn, sensor, sensor_rows[late])
+                        sensor_rows = sensor_rows[~late]
+                        if sensor_rows.empty:
+                            continue
+                runs = encode_runs(sensor_rows)
+                last = conn.execute(
+                    "SELECT rowid, initial_thickness, current_thickness FROM runs"
+                    " WHERE sensor = ? ORDER BY first_seen DESC, rowid DESC LIMIT 1",
+                    (sensor,)
+                ).fetchone()
+                head = runs.iloc[0]
+                if last is not None and (last[1], last[2]) == (float(head['InitialThickness']),
+                                                               float(head['CurrentThickness'])):
+                    conn.execute(
+                        "UPDATE runs SET last_seen = MAX(last_seen, ?), heartbeats = heartbeats + ?,"
+                        " server_update_time = ? WHERE rowid = ?",
+                        (to_epoch_ns([head['LastSeen']])[0], int(head['Heartbeats']),
+                         to_epoch_ns([head['ServerUpdateTime']])[0], last[0])
+                    )
+                    runs = runs.iloc[1:]
+                self._insert_runs(conn, sensor, runs)
+            conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'version'")
+
+    def _backfill(self, conn, sensor, rows):
+        """
+        合并早于该传感器最新时间的读数（逐条按扫描时间处理），只改动受影响的游程：
+        - 落在同厚度游程时间范围内的读数视为已记录，忽略；
+        - 落在不同厚度游程内部的读数把该游程拆成前后两段，中间插入新读数。
+          两段的外侧边界保持原值，内侧边界和心跳次数按该段心跳等间隔的位置划分
+          （与 expand_runs 的还原方式一致）；
+        - 落在游程之间的读数延长相邻的同厚度游程，否则成为新的单次心跳游程。
+        其他游程的首末时间和心跳次数保持不变。
+        """
+        runs = [list(run) for run in conn.execute(
+            "SELECT rowid, initial_thickness, current_thickness, first_seen, last_seen, heartbeats,"
+            " server_update_time FROM runs WHERE sensor = ? ORDER BY first_seen, rowid",
+            (sensor,)
+        )]
+        readings = sorted(zip(
+            to_epoch_ns(rows['SensorScanTime']),
+            to_floats(rows['InitialThickness']),
+            to_floats(rows['CurrentThickness']),
+            to_epoch_ns(rows['ServerUpdateTime']),
+        ), key=lambda reading: reading[0])
+        dirty = set()
+        for scan, initial, current, server_time in readings:
+            i = bisect_right([run[3] for run in runs], scan) - 1
+            new_run = [None, initial, current, scan, scan, 1, server_time]
+            if i >= 0 and scan <= runs[i][4]:
+                run = runs[i]
+                if (run[1], run[2]) == (initial, current):
+                    continue
+                if run[3] < scan < run[4]:
+                    head, tail = _split_run(run, scan)
+                    runs[i:i + 1] = [head, new_run, tail]
+                    dirty.add(id(head))
+                else:
+                    # 与游程边界同一时刻、厚度不同的读数放在该边界的外侧
+                    runs.insert(i + 1 if scan == run[4] else i, new_run)
+                continue
+            previous = runs[i] if i >= 0 else None
+            following = runs[i + 1] if i + 1 < len(runs) else None
+            if previous is not None and (previous[1], previous[2]) == (initial, current):
+                previous[4], previous[5] = scan, previous[5] + 1
+                dirty.add(id(previous))
+            elif following is not None and (following[1], following[2]) == (initial, current):
+                following[3], following[5] = scan, following[5] + 1
+                dirty.add(id(following))
+            else:
+                runs.insert(i + 1, new_run)
+
+        conn.executemany(
+            "UPDATE runs SET first_seen = ?, last_seen = ?, heartbeats = ? WHERE rowid = ?",
+            [(run[3], run[4], run[5], run[0]) for run in runs if run[0] is not None and id(run) in dirty]
+        )
+        conn.executemany(
+            "INSERT INTO runs (sensor, server_update_time, initial_thickness,"
+            " current_thickness, first_seen, last_seen, heartbeats) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(sensor, run[6], run[1], run[2], run[3], run[4], run[5]) for run in runs if run[0] is None]
+        )
+
+    @staticmethod
+    def _insert_runs(conn, sensor, runs):
+        conn.executemany(
+            "INSERT INTO runs (sensor, server_update_time, initial_thickness,"
+            " current_thickness, first_seen, last_seen, heartbeats) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            zip(
+                [sensor] * len(runs),
+                to_epoch_ns(runs['ServerUpdateTime']),
+                to_floats(runs['InitialThickness']),
+                to_floats(runs['CurrentThickness']),
+                to_epoch_ns(runs['FirstSeen']),
+                to_epoch_ns(runs['LastSeen']),
+                [int(n) for n in runs['Heartbeats']],
+            )
+        )
+
+    def compact(self):
+        super().compact()
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="WearFusion run-length sensor store")
+    parser.add_argument('xlsx', help="workbook to import (one sheet per sensor)")
+    parser.add_argument('store', help="run-length SQLite store to create or extend")
+    args = parser.parse_args(argv)
+
+    store = RunLengthStore(args.store)
+    count = import_workbook(store, args.xlsx)
+    print(f"Imported {count} readings into {args.store} as {store.compact()} runs")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,500 @@
+# -*- coding: utf-8 -*-
+import argparse
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+import pandas as pd
+
+from data_cache import file_signature, load_cached, load_workbook, read_only_views
+
+# 传感器历史数据的标准列（与Excel数据库保持一致）
+DB_COLUMNS = [
+    "ServerUpdateTime",
+    "SensorScanTime",
+    "InitialThickness",
+    "CurrentThickness",
+    "Wear"
+]
+
+_JOURNAL_LOCK = threading.Lock()
+
+
+def dedupe_readings(rows):
+    """
+    按 (传感器, SensorScanTime, CurrentThickness) 去除重复读数，保留第一次出现的行。
+    rows 带 Sheet 列时按传感器区分，否则视为同一传感器的数据。
+    扫描时间先解析再比较，文本和datetime两种存储格式可以混用。
+    """
+    key = pd.DataFrame({
+        'scan': pd.to_datetime(rows['SensorScanTime'], format='mixed'),
+        'current': rows['CurrentThickness'].to_numpy(),
+    })
+    if 'Sheet' in rows.columns:
+        key['sensor'] = rows['Sheet'].to_numpy()
+    return rows[~key.duplicated().to_numpy()]
+
+
+def drop_existing(rows, frames):
+    """
+    去掉 rows（带 Sheet 列）中 frames（{sheet_name: 类型化DataFrame}）已有的读数，
+    键为 (传感器, SensorScanTime, CurrentThickness)。用于没有唯一索引的存储。
+    """
+    sheets = set(rows['Sheet']) if not rows.empty else set()
+    existing = [
+        pd.DataFrame({'sensor': name, 'scan': df['SensorScanTime'], 'current': df['CurrentThickness']})
+        for name, df in frames.items() if name in sheets and not df.empty
+    ]
+    if not existing:
+        return rows
+    key = pd.DataFrame({
+        'sensor': rows['Sheet'].to_numpy(),
+        'scan': pd.to_datetime(rows['SensorScanTime'], format='mixed').to_numpy(),
+        'current': rows['CurrentThickness'].to_numpy(dtype='float64'),
+    })
+    existing = pd.concat(existing, ignore_index=True).drop_duplicates()
+    merged = key.merge(existing, how='left', on=['sensor', 'scan', 'current'], indicator=True)
+    return rows[(merged['_merge'] == 'left_only').to_numpy()]
+
+
+# ------------------ Excel 工作簿 + 增量日志 ------------------
+def journal_path(db_file):
+    """数据库增量日志文件路径（与工作簿同目录，例如 xxx.journal.csv）。"""
+    return os.path.splitext(db_file)[0] + ".journal.csv"
+
+
+def _read_journal(path):
+    journal = pd.read_csv(path, parse_dates=['ServerUpdateTime'])
+    return {
+        sheet_name: df.drop(columns='Sheet').reset_index(drop=True)
+        for sheet_name, df in journal.groupby('Sheet', sort=False)
+    }
+
+
+def load_journal(db_file):
+    """
+    读取增量日志，返回 {sheet_name: DataFrame}；日志不存在时返回空字典。
+    日志按文件签名缓存，只有追加了新行才重新读取。
+    """
+    path = journal_path(db_file)
+    if not os.path.exists(path):
+        return {}
+    return load_cached(path, _read_journal)
+
+
+def merge_journal(db_dict, journal):
+    """将增量日志中的行接到对应工作表末尾，返回新的字典（不修改输入）。"""
+    merged = dict(db_dict)
+    for sheet_name, rows in journal.items():
+        base = merged.get(sheet_name)
+        if base is None or base.empty:
+            merged[sheet_name] = rows
+        else:
+            merged[sheet_name] = pd.concat([base, rows], ignore_index=True)
+    return merged
+
+
+def append_journal(db_file, rows):
+    """
+    以追加方式把新行写入增量日志，不重写工作簿。
+    """
+    if rows.empty:
+        return
+    path = journal_path(db_file)
+    write_header = not os.path.exists(path) or os.path.getsize(path) == 0
+    rows[['Sheet'] + DB_COLUMNS].to_csv(path, mode='a', header=write_header, index=False)
+
+
+def fold_journal(db_file):
+    """
+    把增量日志合并回Excel工作簿并删除日志（一次性全量写入，适合离线维护时执行）。
+    返回合并的行数。
+    """
+    path = journal_path(db_file)
+    if not os.path.exists(path):
+        return 0
+    with _JOURNAL_LOCK:
+        journal = _read_journal(path)
+        with pd.ExcelFile(db_file) as xls:
+            db_dict = pd.read_excel(xls, sheet_name=None)
+        merged = merge_journal(db_dict, journal)
+        with pd.ExcelWriter(db_file, engine='openpyxl') as writer:
+            for sheet_name, df in merged.items():
+                df.to_excel(writer, sheet_name=sheet_name, index=False)
+        os.remove(path)
+    return sum(len(df) for df in journal.values())
+
+
+def typed_frame(df):
+    """
+    把一个传感器的读数转换为类型化、按扫描时间排序的DataFrame：
+    时间列为datetime64，厚度列为float64。已经是该格式时不做任何复制。
+    """
+    columns = {}
+    for col in ('ServerUpdateTime', 'SensorScanTime'):
+        if not pd.api.types.is_datetime64_dtype(df[col]):
+            columns[col] = pd.to_datetime(df[col], format='mixed')
+    for col in ('InitialThickness', 'CurrentThickness', 'Wear'):
+        if df[col].dtype != 'float64':
+            columns[col] = df[col].astype('float64')
+    if columns:
+        df = df.assign(**columns)
+    if not df['SensorScanTime'].is_monotonic_increasing:
+        df = df.sort_values('SensorScanTime', kind='stable').reset_index(drop=True)
+    return df[DB_COLUMNS]
+
+
+class ExcelStore:
+    """
+    以Excel工作簿为主存储（每个传感器一个工作表），新读数追加到增量日志。
+    保留用于兼容旧部署；新部署建议使用 SQLiteStore。
+    """
+    def __init__(self, db_file):
+        self.path = db_file
+        self._lock = threading.Lock()
+        self._cached = (None, None)
+
+    def version(self):
+        journal = journal_path(self.path)
+        signatures = [file_signature(self.path)]
+        if os.path.exists(journal):
+            signatures.append(file_signature(journal))
+        return tuple(signatures)
+
+    def load(self):
+        """返回 {sheet_name: DataFrame}（只读视图），文本时间在这里解析一次并按扫描时间排序。"""
+        version = self.version()
+        with self._lock:
+            cached_version, frames = self._cached
+            if cached_version != version:
+                merged = merge_journal(load_workbook(self.path), load_journal(self.path))
+                frames = {name: typed_frame(df) for name, df in merged.items()}
+                self._cached = (version, frames)
+        return read_only_views(frames)
+
+    def high_water_marks(self):
+        return {
+            name: df['SensorScanTime'].iloc[-1] if not df.empty else pd.NaT
+            for name, df in self.load().items()
+        }
+
+    def add_sensors(self, names):
+        # 新工作表随第一条读数一起出现在增量日志中
+        pass
+
+    def append(self, rows):
+        """追加读数到增量日志；与工作簿或日志中已有读数重复的行被忽略。"""
+        with _JOURNAL_LOCK:
+            append_journal(self.path, drop_existing(dedupe_readings(rows), self.load()))
+
+
+# ------------------ SQLite 存储（类型化列 + 索引） ------------------
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sensors (
+    name TEXT PRIMARY KEY,
+    position INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS readings (
+    sensor TEXT NOT NULL,
+    server_update_time INTEGER,
+    scan_time INTEGER NOT NULL,
+    initial_thickness REAL,
+    current_thickness REAL,
+    wear REAL
+);
+CREATE INDEX IF NOT EXISTS idx_readings_sensor_scan ON readings (sensor, scan_time);
+DELETE FROM readings WHERE rowid NOT IN (
+    SELECT MIN(rowid) FROM readings GROUP BY sensor, scan_time, current_thickness
+);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_readings_key ON readings (sensor, scan_time, current_thickness);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('version', 0);
+UPDATE meta SET value = value + 1 WHERE key = 'version';
+"""
+
+
+def to_epoch_ns(values):
+    # 时间统一存为纳秒整数，NaT存为NULL
+    ts = pd.to_datetime(pd.Series(values), format='mixed')
+    ns = ts.to_numpy('datetime64[ns]').view('int64')
+    return [None if missing else int(n) for n, missing in zip(ns, ts.isna())]
+
+
+def to_floats(values):
+    return [None if pd.isna(v) else float(v) for v in values]
+
+
+class SQLiteStore:
+    """
+    SQLite存储：时间列为纳秒整数、厚度列为REAL，按 (sensor, scan_time) 建索引。
+    (sensor, scan_time, current_thickness) 上有唯一索引，重复读数在写入时被忽略。
+    load() 结果按数据版本号缓存，只有写入新数据后才重新查询。
+    """
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._cached = (None, None)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            # 旧版本存储没有唯一索引：先去重再建索引（只在第一次升级时执行）
+            if conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'uq_readings_key'"
+            ).fetchone() is None:
+                conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def version(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0]
+
+    def sensor_names(self):
+        with self._connect() as conn:
+            return [name for (name,) in conn.execute("SELECT name FROM sensors ORDER BY position")]
+
+    def _read_frames(self):
+        with self._connect() as conn:
+            names = [name for (name,) in conn.execute("SELECT name FROM sensors ORDER BY position")]
+            readings = pd.read_sql_query(
+                "SELECT sensor, server_update_time, scan_time, initial_thickness,"
+                " current_thickness, wear FROM readings ORDER BY sensor, scan_time, rowid",
+                conn,
+                dtype={'server_update_time': 'Int64', 'scan_time': 'int64'},
+            )
+        readings = pd.DataFrame({
+            'sensor': readings['sensor'],
+            'ServerUpdateTime': pd.to_datetime(readings['server_update_time'], unit='ns'),
+            'SensorScanTime': pd.to_datetime(readings['scan_time'], unit='ns'),
+            'InitialThickness': readings['initial_thickness'].astype('float64'),
+            'CurrentThickness': readings['current_thickness'].astype('float64'),
+            'Wear': readings['wear'].astype('float64'),
+        })
+        groups = {
+            name: df.drop(columns='sensor').reset_index(drop=True)
+            for name, df in readings.groupby('sensor', sort=False)
+        }
+        empty = pd.DataFrame({col: readings[col].iloc[:0] for col in DB_COLUMNS})
+        return {name: groups.get(name, empty) for name in names}
+
+    def load(self):
+        """返回 {sensor: DataFrame}（只读视图），列为 DB_COLUMNS，按扫描时间排序。"""
+        version = self.version()
+        with self._lock:
+            cached_version, frames = self._cached
+            if cached_version != version:
+                frames = self._read_frames()
+                self._cached = (version, frames)
+        return read_only_views(frames)
+
+    def high_water_marks(self):
+        with self._connect() as conn:
+            names = [name for (name,) in conn.execute("SELECT name FROM sensors ORDER BY position")]
+            marks = dict(conn.execute("SELECT sensor, MAX(scan_time) FROM readings GROUP BY sensor"))
+        return {name: pd.Timestamp(marks[name]) if name in marks else pd.NaT for name in names}
+
+    def add_sensors(self, names):
+        """登记传感器（保持工作表顺序），已存在的忽略。"""
+        with self._connect() as conn:
+            self._add_sensors(conn, names)
+
+    @staticmethod
+    def _add_sensors(conn, names):
+        for name in names:
+            conn.execute(
+                "INSERT OR IGNORE INTO sensors (name, position)"
+                " SELECT ?, COALESCE(MAX(position) + 1, 0) FROM sensors",
+                (name,)
+            )
+
+    def append(self, rows):
+        """追加读数，rows 需包含 Sheet 列和 DB_COLUMNS；在单个事务中完成，重复读数被忽略。"""
+        if rows.empty:
+            return
+        records = zip(
+            rows['Sheet'],
+            to_epoch_ns(rows['ServerUpdateTime']),
+            to_epoch_ns(rows['SensorScanTime']),
+            to_floats(rows['InitialThickness']),
+            to_floats(rows['CurrentThickness']),
+            to_floats(rows['Wear']),
+        )
+        with self._connect() as conn:
+            self._add_sensors(conn, pd.unique(rows['Sheet']))
+            conn.executemany(
+                "INSERT OR IGNORE INTO readings (sensor, server_update_time, scan_time,"
+                " initial_thickness, current_thickness, wear) VALUES (?, ?, ?, ?, ?, ?)",
+                records
+            )
+            conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'version'")
+
+    def compact(self):
+        """回收已删除行占用的空间，返回当前读数行数。"""
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.execute("VACUUM")
+            return conn.execute("SELECT COUNT(*) FROM readings").fetchone()[0]
+        finally:
+            conn.close()
+
+
+# ------------------ 所有传感器的长表 ------------------
+_LONG_FRAMES = {}  # 存储路径 -> (数据版本, 长表)
+_LONG_LOCK = threading.Lock()
+
+
+def load_long_frame(store):
+    """
+    所有传感器读数合并的长表（sensorName + DB_COLUMNS），按传感器、扫描时间排序。
+    按数据版本缓存，供状态、绘图、导出等路径共享，不在每次rerun时重新拼接。
+    """
+    version = store.version()
+    with _LONG_LOCK:
+        cached = _LONG_FRAMES.get(store.path)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+    frames = [df.assign(sensorName=name) for name, df in store.load().items() if not df.empty]
+    if frames:
+        long_df = pd.concat(frames, ignore_index=True)[['sensorName'] + DB_COLUMNS]
+    else:
+        long_df = pd.DataFrame({
+            'sensorName': pd.Series(dtype='object'),
+            'ServerUpdateTime': pd.Series(dtype='datetime64[ns]'),
+            'SensorScanTime': pd.Series(dtype='datetime64[ns]'),
+            'InitialThickness': pd.Series(dtype='float64'),
+            'CurrentThickness': pd.Series(dtype='float64'),
+            'Wear': pd.Series(dtype='float64'),
+        })
+    with _LONG_LOCK:
+        _LONG_FRAMES[store.path] = (version, long_df)
+    return long_df
+
+
+# ------------------ 导入 / 导出 ------------------
+# SQLite存储模式：readings 为逐条读数（SQLiteStore），runs 为游程压缩（sensor_runs.RunLengthStore）
+STORE_MODES = ('readings', 'runs')
+
+
+def _has_table(path, table):
+    """SQLite文件中是否已有该表（文件不存在时为False，不会创建文件）。"""
+    if not os.path.exists(path):
+        return False
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, timeout=30)
+    try:
+        return conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+        ).fetchone() is not None
+    finally:
+        conn.close()
+
+
+def open_store(path, seed_file=None, mode=None):
+    """
+    按扩展名打开存储：.xlsx 为 ExcelStore，其余（.sqlite/.db）为SQLite存储。
+    mode 为 STORE_MODES 之一；未指定时按文件内容判断：已有 runs 表的文件
+    （例如由 python sensor_runs.py 创建）为 RunLengthStore，否则为 SQLiteStore。
+    SQLite存储为空且提供了 seed_file 时，先从该Excel工作簿导入历史数据。
+    """
+    if path.lower().endswith('.xlsx'):
+        return ExcelStore(path)
+    if mode is None:
+        mode = 'runs' if _has_table(path, 'runs') else 'readings'
+    if mode == 'runs':
+        from sensor_runs import RunLengthStore  # sensor_runs 依赖本模块，这里延迟导入
+        store = RunLengthStore(path)
+    elif mode == 'readings':
+        store = SQLiteStore(path)
+    else:
+        raise ValueError(f"unknown store mode {mode!r}, expected one of {', '.join(STORE_MODES)}")
+    if seed_file and os.path.exists(seed_file) and not store.sensor_names():
+        import_workbook(store, seed_file)
+    return store
+
+
+def workbook_rows(sheets):
+    """把 {sheet_name: DataFrame} 转为带 Sheet 列的长表，便于一次性追加。"""
+    frames = [df[DB_COLUMNS].assign(Sheet=name) for name, df in sheets.items() if not df.empty]
+    if not frames:
+        return pd.DataFrame(columns=['Sheet'] + DB_COLUMNS)
+    return pd.concat(frames, ignore_index=True)
+
+
+def import_workbook(store, xlsx_file):
+    """从Excel工作簿（每个传感器一个工作表）导入全部读数（重复读数只导入一次），返回导入行数。"""
+    with pd.ExcelFile(xlsx_file) as xls:
+        sheets = pd.read_excel(xls, sheet_name=None)
+    for sheet_name, df in sheets.items():
+        if len(df.columns) != len(DB_COLUMNS):
+            raise ValueError(f"工作表 '{sheet_name}' 列数不匹配："
+                             f"需要 {len(DB_COLUMNS)} 列，实际 {len(df.columns)} 列")
+        df.columns = DB_COLUMNS
+    store.add_sensors(list(sheets))
+    rows = dedupe_readings(workbook_rows(sheets))
+    store.append(rows)
+    return len(rows)
+
+
+def export_workbook(store, target):
+    """把存储导出为Excel工作簿（每个传感器一个工作表），target 可以是路径或 BytesIO。"""
+    with pd.ExcelWriter(target, engine='openpyxl') as writer:
+        for sheet_name, df in store.load().items():
+            df.to_excel(writer, sheet_name=sheet_name, index=False)
+
+
+def compact_workbook(xlsx_file, output_file=None):
+    """
+    一次性压缩已有的Excel工作簿：每个工作表内按 (SensorScanTime, CurrentThickness)
+    去除重复行后写回（或写到 output_file）。返回 {sheet_name: (原行数, 压缩后行数)}。
+    """
+    with pd.ExcelFile(xlsx_file) as xls:
+        sheets = pd.read_excel(xls, sheet_name=None)
+    compacted = {name: dedupe_readings(df) for name, df in sheets.items()}
+    with pd.ExcelWriter(output_file or xlsx_file, engine='openpyxl') as writer:
+        for sheet_name, df in compacted.items():
+            df.to_excel(writer, sheet_name=sheet_name, index=False)
+    return {name: (len(sheets[name]), len(df)) for name, df in compacted.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="WearFusion sensor store maintenance")
+    commands = parser.add_subparsers(dest='command', required=True)
+    cmd = commands.add_parser('import', help="import an xlsx workbook into a store")
+    cmd.add_argument('xlsx')
+    cmd.add_argument('store')
+    cmd.add_argument('--mode', choices=STORE_MODES, default=None,
+                     help="storage mode for a new SQLite store (default: detect, else readings)")
+    cmd = commands.add_parser('export', help="export a store to an xlsx workbook")
+    cmd.add_argument('store')
+    cmd.add_argument('xlsx')
+    cmd = commands.add_parser('compact', help="remove duplicate readings from an xlsx workbook or a store")
+    cmd.add_argument('path')
+    cmd.add_argument('-o', '--output', help="write the compacted workbook here instead of in place")
+    args = parser.parse_args(argv)
+
+    if args.command == 'import':
+        count = import_workbook(open_store(args.store, mode=args.mode), args.xlsx)
+        print(f"Imported {count} readings into {args.store}")
+    elif args.command == 'export':
+        export_workbook(open_store(args.store), args.xlsx)
+        print(f"Exported {args.store} to {args.xlsx}")
+    elif args.command == 'compact':
+        if args.path.lower().endswith('.xlsx'):
+            for sheet_name, (before, after) in compact_workbook(args.path, args.output).items():
+                print(f"{sheet_name}: {before} -> {after} rows")
+        else:
+            # 打开存储时会完成去重升级，这里再回收空间
+            print(f"{args.path}: {open_store(args.path).compact()} rows")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+import streamlit as st
+import pandas as pd
+import numpy as np
+import plotly.graph_objects as go
+
+from asset_registry import load_registry
+from data_cache import enable_copy_on_write
+from multipage import navigate_to
+
+# 热力图中各状态区间的颜色（区间顺序与 wear_bands.DEFAULT_BANDS 一致）
+BAND_FILL = {'replace': '#d62728', 'inspect': '#ff7f0e', 'order': '#1f77b4', 'ok': '#2ca02c'}
+NO_DATA_FILL = '#d9d9d9'
+SUMMARY_KEY = 'fleet_summary'
+
+
+def fleet_status(registry):
+    """
+    汇总登记表中所有资产的传感器状态，返回一张长表：
+    asset, title, site, truck + 传感器状态列（sensorName, latestTime, totalLength, actualLength, wear, band）。
+    每个资产的状态由各自的后台入库线程预计算，这里只做拼接。
+    """
+    # 资产页面模块（存储、入库、导出等）在第一次汇总时才导入
+    from spages.Golding830E2507 import get_worker
+    frames = []
+    for asset in registry:
+        worker = get_worker(asset.latest_file, asset.store_file, asset.db_file, asset.drop_dir)
+        _, data = worker.snapshot()
+        if data is None:
+            continue
+        frames.append(data['status'].assign(asset=asset.id, title=asset.title,
+                                            site=asset.site, truck=asset.truck))
+    if not frames:
+        return pd.DataFrame(columns=['asset', 'title', 'site', 'truck', 'sensorName', 'latestTime',
+                                     'totalLength', 'actualLength', 'wear', 'band'])
+    status = pd.concat(frames, ignore_index=True)
+    return status[['asset', 'title', 'site', 'truck'] + list(frames[0].columns[:-4])]
+
+
+def asset_summary(status):
+    """每个资产一行：传感器数、最薄厚度、最严重的状态区间和最新读数时间。"""
+    # 区间按 replace < inspect < order < ok 排列，编码最小的即最严重的状态
+    codes = status['band'].cat.codes.where(status['band'].notna())
+    summary = status.assign(_code=codes).groupby(['asset', 'title', 'site', 'truck'], sort=False).agg(
+        sensors=('sensorName', 'size'),
+        minThickness=('actualLength', 'min'),
+        worst=('_code', 'min'),
+        latestTime=('latestTime', 'max'),
+    ).reset_index()
+    categories = status['band'].cat.categories
+    summary['worstBand'] = [categories[int(c)] if pd.notna(c) else None for c in summary.pop('worst')]
+    return summary
+
+
+def status_heatmap(status, registry):
+    """
+    整个车队一张热力图：每行一个资产，每列一个传感器，颜色为状态区间，数字为当前厚度。
+    行和列按登记表（资产及其 sensors）排列，没有读数的传感器显示为灰色格子。
+    不论传感器数量多少，只向浏览器发送一个图表。
+    """
+    codes = status['band'].cat.codes.astype('float64').where(status['band'].notna())
+    titles = [asset.title for asset in registry]
+    # 登记的传感器在前，数据中出现但未登记的传感器接在后面
+    sensors = list(dict.fromkeys([sheet for asset in registry for sheet in asset.sensor_sheets]
+                                 + list(status['sensorName'])))
+    grid = status.assign(code=codes).pivot_table(
+        index='title', columns='sensorName', values=['code', 'actualLength'],
+        aggfunc='first', sort=False, dropna=False
+    )
+    categories = list(status['band'].cat.categories)
+    z = grid['code'].reindex(index=titles, columns=sensors).to_numpy(dtype='float64')
+    thickness = grid['actualLength'].reindex(index=titles, columns=sensors).to_numpy(dtype='float64')
+    text = np.where(np.isnan(thickness), "", np.char.mod('%g', np.nan_to_num(thickness)))
+    # 离散色阶：每个区间编码 i 对应 [i, i+1) / n 的一段颜色
+    n = len(categories)
+    colorscale = []
+    for i, band in enumerate(categories):
+        colorscale += [[i / n, BAND_FILL.get(band, NO_DATA_FILL)], [(i + 1) / n, BAND_FILL.get(band, NO_DATA_FILL)]]
+    fig = go.Figure(go.Heatmap(
+        z=z + 0.5,
+        x=sensors,
+        y=titles,
+        text=text,
+        texttemplate="%{text}",
+        zmin=0,
+        zmax=n,
+        colorscale=colorscale,
+        showscale=False,
+        xgap=2,
+        ygap=2,
+        hovertemplate="%{y}<br>%{x}: %{text}mm<extra></extra>",
+    ))
+    fig.update_layout(height=120 + 40 * len(titles), margin=dict(l=10, r=10, t=10, b=10),
+                      plot_bgcolor=NO_DATA_FILL)
+    fig.update_yaxes(autorange='reversed')
+    return fig
+
+
+def _drill_down(labels):
+    """汇总表选中一行时切换到该资产的页面。"""
+    rows = st.session_state[SUMMARY_KEY].selection.rows
+    if rows:
+        navigate_to(labels[rows[0]])
+
+
+def app():
+    # 共享缓存以写时复制视图分发给各会话，打开数据页面时显式开启
+    enable_copy_on_write()
+    st.subheader("WearFusion Fleet Overview", divider='rainbow')
+    registry = load_registry()
+    status = fleet_status(registry)
+    if status.empty:
+        st.info("Sensor data is loading, please refresh shortly.")
+        return
+
+    st.markdown("1. Fleet Wear Status")
+    st.plotly_chart(status_heatmap(status, registry))
+
+    st.markdown("2. Asset Summary")
+    st.caption("Select an asset to open its page.")
+    summary = asset_summary(status)
+    labels = [registry.get(asset_id).label for asset_id in summary['asset']]
+    st.dataframe(summary, hide_index=True, width='stretch', key=SUMMARY_KEY,
+                 on_select=lambda: _drill_down(labels), selection_mode='single-row')
+
+    with st.expander("Sensor Details"):
+        st.dataframe(status, hide_index=True, width='stretch')
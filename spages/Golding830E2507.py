@@ -3,64 +3,163 @@ import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 import os
-from io import BytesIO
 from streamlit.components.v1 import html
 from datetime import datetime
 
-def update_database_from_latest(latest_file, db_file):
+from data_cache import enable_copy_on_write, load_first_sheet
+from sensor_ingest import ingest_latest
+from sensor_store import open_store, load_long_frame, typed_frame
+from sensor_export import EXPORT_FORMATS, available_formats, export_artifact
+from sensor_runs import load_runs, runs_to_steps
+from thickness_steps import step_index
+from chart_downsample import downsample, visible_slice
+from ingest_worker import IngestWorker
+from asset_registry import load_registry
+from image_assets import asset_image
+from sensor_calibration import CalibratedStore
+from wear_bands import DEFAULT_SCHEME
+from wear_forecast import wear_forecast
+
+# 曲线发送到浏览器的点数预算（所有传感器合计），超过WebGL阈值时改用Scattergl渲染
+MAX_CHART_POINTS = 4000
+WEBGL_THRESHOLD = 2000
+# 曲线可选时间窗口（天），None表示全部
+TIME_WINDOWS = {"All": None, "Last 90 Days": 90, "Last 30 Days": 30, "Last 7 Days": 7}
+# 会话状态：本会话请求下载的导出 (存储, 格式, 传感器, 起止时间)
+EXPORT_REQUEST_KEY = 'export_request'
+
+@st.cache_resource
+def get_store(store_file, seed_file):
+    """
+    打开传感器数据存储（进程内只打开一次，所有会话共享）。
+    SQLite存储首次使用时从Excel工作簿导入历史数据，之后Excel只作为导入/导出格式。
+    """
+    return open_store(store_file, seed_file=seed_file)
+
+
+@st.cache_resource
+def get_view(store_file, seed_file):
+    """
+    存储的校准视图（calibration.yaml，进程内共享）。页面上的状态、曲线、台阶区间和导出
+    都读取校准后的厚度，存储中保留传感器原始读数。
+    """
+    return CalibratedStore(get_store(store_file, seed_file))
+
+
+def build_dashboard_data(store, latest_df):
+    """
+    预计算页面需要的全部数据（由后台入库线程在数据变化时调用一次）：
+    数据库字典、最新读数、传感器状态、厚度台阶索引、磨损预测和绘图用的台阶点。
+    """
+    db_dict = store.load()  # 只读映射，所有会话共享
+    # 校准视图（CalibratedStore）的厚度需按校准系数对照传感器刻度线分类
+    calibration = store.calibration() if hasattr(store, 'calibration') else None
+    return {
+        'db_dict': db_dict,
+        'latest_df': latest_df,
+        'calibration': calibration,
+        'status': get_latest_sensor_status(db_dict, long_df=load_long_frame(store), calibration=calibration),
+        'steps': step_index(store),
+        'forecast': wear_forecast(store).set_index('sensorName'),
+        'chart': {name: runs_to_steps(runs) for name, runs in load_runs(store).items()},
+    }
+
+
+@st.cache_resource
+def get_worker(latest_file, store_file, seed_file, drop_dir=None):
+    """
+    启动后台入库线程（进程内只启动一次，所有会话共享）。
+    线程负责读取最新读数（单个文件和投放目录）、入库和预计算，页面渲染只读取它发布的结果。
+    """
+    worker = IngestWorker(get_store(store_file, seed_file), latest_file, build_dashboard_data,
+                          drop_dir=drop_dir, view=get_view(store_file, seed_file))
+    worker.start()
+    return worker
+
+
+def update_database_from_latest(latest_file, store):
     """
     读取最新读数文件，匹配ID并追加到数据库对应工作表中。
     返回更新后的数据库字典和最新读数DataFrame。
+    最新读数文件经过进程级缓存读取，只有文件内容变化时才重新解析；
+    新读数（ID 01C -> 工作表 BDT-LLT-01C）中只有晚于该传感器最新扫描时间的行
+    才会被追加到存储中。store 可以是存储对象或存储文件路径。
     """
+    if isinstance(store, str):
+        store = open_store(store)
+
     # 读取最新读数文件
-    latest_df = pd.read_excel(latest_file, sheet_name=0)
+    latest_df = load_first_sheet(latest_file)
     # 确保列名正确（根据示例文件，列名为uploadTime, ID, SensorTotalLength, SensorCurrentLength）
     # 如果文件可能有多行，这里直接使用全部数据
     
-    # 读取数据库所有工作表
-    xls = pd.ExcelFile(db_file)
-    db_dict = pd.read_excel(xls, sheet_name=None)
+    # 增量入库：只追加比高水位线更新的读数（台阶索引按校准视图增量更新）
+    view = CalibratedStore(store)
+    ingest_latest(latest_df, store, view=view)
+
+    # 读取数据库所有传感器（校准后的只读视图，所有会话共享）
+    db_dict = dict(view.load())
 
     return db_dict, latest_df
 
-def get_latest_sensor_status(db_dict):
+def sensor_long_frame(db_dict):
     """
-    从数据库字典中提取每个传感器的最新一条记录，用于状态显示。
-    返回DataFrame，列：sensorName, latestTime, totalLength, actualLength
+    把数据库字典 {sensorName: DataFrame} 合并为一张长表（增加 sensorName 列），
+    便于对所有传感器做一次性分组计算。来自存储的数据请直接使用
+    sensor_store.load_long_frame(store)，它按数据版本缓存，不必每次重新拼接。
     """
-    results = []
-    for sheet_name, df in db_dict.items():
-        if df.empty:
-            results.append({
-                'sensorName': sheet_name,
-                'latestTime': None,
-                'totalLength': None,
-                'actualLength': None
-            })
-        else:
-            last_row = df.iloc[-1]
-            results.append({
-                'sensorName': sheet_name,
-                'latestTime': last_row['SensorScanTime'],  # 使用传感器扫描时间作为最新时间
-                'totalLength': last_row['InitialThickness'],
-                'actualLength': last_row['CurrentThickness']
-            })
-    return pd.DataFrame(results)
-
-def plot_sensor_data_from_dict(db_dict):
+    frames = [typed_frame(df).assign(sensorName=name) for name, df in db_dict.items() if not df.empty]
+    if not frames:
+        return pd.DataFrame(columns=['sensorName', 'SensorScanTime', 'InitialThickness', 'CurrentThickness'])
+    return pd.concat(frames, ignore_index=True)
+
+
+def get_latest_sensor_status(db_dict, long_df=None, scheme=DEFAULT_SCHEME, calibration=None):
+    """
+    从数据库字典中提取每个传感器的最新一条记录（按扫描时间，而非行顺序），用于状态显示。
+    所有传感器在一张长表上一次分组完成，不逐个工作表循环；
+    long_df 为已按传感器、扫描时间排序的长表（load_long_frame），提供时直接使用。
+    返回DataFrame，列：sensorName, latestTime, totalLength, actualLength, wear, band
+    band 由 scheme（wear_bands.BandScheme）按 actualLength 分类：
+    ok / order / inspect / replace，无数据为NaN。db_dict 为校准后的厚度时传入
+    calibration（sensor_calibration.CalibrationTable），按各传感器的校准系数对照刻度线分类。
+    """
+    if long_df is None:
+        long_df = sensor_long_frame(db_dict)
+    # 长表已按 (sensorName, SensorScanTime) 排序，每组最后一行即最新读数
+    latest = (
+        long_df.groupby('sensorName', sort=False)
+        .tail(1)
+        .set_index('sensorName')
+        .reindex(list(db_dict))  # 保持工作表顺序，无数据的传感器为NaN
+    )
+    status = pd.DataFrame({
+        'sensorName': latest.index,
+        'latestTime': latest['SensorScanTime'].to_numpy(),  # 使用传感器扫描时间作为最新时间
+        'totalLength': latest['InitialThickness'].to_numpy(dtype='float64'),
+        'actualLength': latest['CurrentThickness'].to_numpy(dtype='float64'),
+    })
+    status['wear'] = status['totalLength'] - status['actualLength']
+
+    scale, offset = (1.0, 0.0) if calibration is None else calibration.coefficient_arrays(status['sensorName'])
+    status['band'] = scheme.classify(status['actualLength'].to_numpy(), scale, offset)
+    return status
+
+def plot_sensor_data_from_dict(db_dict, x_range=None, max_points=MAX_CHART_POINTS,
+                               webgl_threshold=WEBGL_THRESHOLD, method='minmax', scheme=DEFAULT_SCHEME,
+                               calibration=None):
     """
     基于数据库字典绘制每个传感器的CurrentThickness随时间变化曲线，
     并添加水平线标注InitialThickness，以及预定义的磨损阈值线。
+    x_range=(start, end) 时只绘制该时间范围；每条曲线在服务器端降采样到
+    max_points/传感器数 个点以内（默认保留台阶边缘），总点数超过
+    webgl_threshold 时使用 Scattergl。曲线为校准后的厚度时传入 calibration，
+    阈值线按默认校准系数画在对应位置。
     """
     fig = go.Figure()
     
-    # 定义阈值线和颜色
-    threshold_lines = [
-        (31, 'black'), (30, 'black'), (26, 'black'), (22, 'black'),
-        (18, 'blue'),
-        (14, 'orange'), (12, 'orange'),
-        (10, 'red')
-    ]
+    # 阈值线和颜色（颜色与状态区间一致）
+    threshold_lines = scheme.threshold_lines(*(calibration.default if calibration is not None else ()))
     
     # 添加全局阈值水平线（粗实线）
     for y_val, color in threshold_lines:
@@ -73,33 +172,47 @@ def plot_sensor_data_from_dict(db_dict):
         )
     
     # 处理每个传感器的数据
+    start, end = x_range if x_range is not None else (None, None)
+    budget = max(max_points // max(len(db_dict), 1), 3)
+    traces = []
     for sheet_name, df in db_dict.items():
         if df.empty:
             continue
-        # 转换时间列
-        df['SensorScanTime'] = pd.to_datetime(df['SensorScanTime'])
-        # 按时间排序
-        df = df.sort_values('SensorScanTime')
-        # 添加当前厚度曲线
-        fig.add_trace(go.Scatter(
-            x=df['SensorScanTime'],
-            y=df['CurrentThickness']+1,  # 加1mm作为当前厚度的容差
-            mode='lines+markers',
-            name=f"{sheet_name} (Current)"
-        ))
+        # 存储中的数据已在加载时完成类型转换和排序，这里不会修改或复制共享的DataFrame
+        df = typed_frame(df)
+        # 只保留可见时间范围，再降采样到点数预算内
+        scan_time = df['SensorScanTime'].to_numpy('datetime64[ns]')
+        current = df['CurrentThickness'].to_numpy()
+        visible = visible_slice(scan_time, start, end)
+        scan_time, current = scan_time[visible], current[visible]
+        keep = downsample(scan_time, current, budget, method=method)
+        traces.append((sheet_name, scan_time[keep], current[keep]))
         # 添加初始厚度水平线（取第一行的InitialThickness，虚线）
         init_val = df['InitialThickness'].iloc[0]
         fig.add_hline(
             y=init_val,
             line_dash="dash",
             line_color="gray",
-            annotation_text=f"{sheet_name} Init: {init_val+1}mm",
+            annotation_text=f"{sheet_name} Init: {init_val:g}mm",
             annotation_position="top left"
         )
+
+    # 添加当前厚度曲线
+    scatter = go.Scattergl if sum(len(x) for _, x, _ in traces) > webgl_threshold else go.Scatter
+    for sheet_name, x, y in traces:
+        fig.add_trace(scatter(
+            x=x,
+            y=y,
+            mode='lines+markers',
+            name=f"{sheet_name} (Current)"
+        ))
     
     # 设置坐标轴范围及标签
     fig.update_yaxes(title_text="Thickness (mm)", range=[5, 35])
     fig.update_xaxes(title_text="Sensor Scan Time")
+    if x_range is not None:
+        # 数据两端各多保留了一个点（可能远在窗口之外），坐标轴范围需显式设为时间窗口
+        fig.update_xaxes(range=list(x_range))
     
     fig.update_layout(
     # 添加边框设置
@@ -112,56 +225,65 @@ def plot_sensor_data_from_dict(db_dict):
 
     return fig
 
-def downloadData(file_path):
-    # 定义新的列名
-    NEW_COLUMNS = [
-        "ServerUpdateTime", 
-        "SensorScanTime", 
-        "InitialThickness", 
-        "CurrentThickness", 
-        "Wear"
-    ]
-
+def downloadData(store, file_name, sensor_status_df=None):
     try:
-        # 读取所有工作表（返回字典格式：{sheet_name: DataFrame}）
-        with pd.ExcelFile(file_path) as excel_file:
-            # 创建内存缓冲区
-            output = BytesIO()
-            
-            # 使用ExcelWriter将处理后的数据写入内存
-            with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                # 遍历每个工作表
-                for sheet_name in excel_file.sheet_names:
-                    df = pd.read_excel(excel_file, sheet_name=sheet_name)
-                    
-                    # 检查列数是否匹配
-                    if len(df.columns) != len(NEW_COLUMNS):
-                        raise ValueError(f"工作表 '{sheet_name}' 列数不匹配："
-                                        f"需要 {len(NEW_COLUMNS)} 列，实际 {len(df.columns)} 列")
-                    
-                    # 重命名列
-                    df.columns = NEW_COLUMNS
-                    
-                    # 写入新的Excel文件
-                    df.to_excel(
-                        writer,
-                        sheet_name=sheet_name,
-                        index=False
-                    )
-            
-            # 创建下载按钮
+        # 导出选项：格式、传感器、扫描日期范围
+        sensor_names = list(store.load())
+        col_format, col_sensor = st.columns([1, 2])
+        fmt = col_format.selectbox(
+            "Export Format",
+            available_formats(),
+            format_func=lambda f: EXPORT_FORMATS[f][2]
+        )
+        sensors = col_sensor.multiselect("Sensors", sensor_names, default=sensor_names)
+        start = end = None
+        if sensor_status_df is not None and sensor_status_df['latestTime'].notna().any():
+            date_range = st.date_input(
+                "Scan Date Range",
+                value=(),
+                max_value=sensor_status_df['latestTime'].max().date()
+            )
+            if len(date_range) == 2:
+                start = pd.Timestamp(date_range[0])
+                end = pd.Timestamp(date_range[1]) + pd.Timedelta(days=1) - pd.Timedelta(1, 'ns')
+        if not sensors:
+            st.info("Select at least one sensor to export.")
+            return
+        if set(sensors) == set(sensor_names):
+            sensors = None
+
+        # 导出文件按数据版本和过滤条件缓存（流式写入临时文件，所有会话共享）。
+        # 下载按钮会把整个文件读入媒体管理器，因此只在本会话点击准备按钮之后才显示，
+        # 下载完成后清除标记，之后的rerun不再读取文件
+        request = (store.path, fmt, None if sensors is None else tuple(sensors), start, end)
+        if st.session_state.get(EXPORT_REQUEST_KEY) != request:
+            if not st.button(":material/Database:  Prepare Database Download", width='stretch'):
+                return
+            st.session_state[EXPORT_REQUEST_KEY] = request
+        path = export_artifact(store, fmt, build=True, sensors=sensors, start=start, end=end)
+        try:
+            f = open(path, 'rb')
+        except FileNotFoundError:
+            # 返回后导出文件被其他会话清理（数据更新或超过缓存数量），重新生成一次
+            path = export_artifact(store, fmt, build=True, sensors=sensors, start=start, end=end)
+            f = open(path, 'rb')
+
+        # 创建下载按钮
+        extension, mime, _ = EXPORT_FORMATS[fmt]
+        with f:
             st.download_button(
                 label=":material/Download:  Download Database",
-                data=output.getvalue(),
-                file_name=file_path,
-                mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+                data=f,
+                file_name=os.path.splitext(os.path.basename(file_name))[0] + extension,
+                mime=mime,
+                on_click=lambda: st.session_state.pop(EXPORT_REQUEST_KEY, None),
                 width='stretch'
             )
-            
-            st.success("Sensor database available. Please click button to download!!!")    
+        
+        st.success("Sensor database available. Please click button to download!!!")    
 
-    except FileNotFoundError:
-        st.error(f"File not found : {file_path}")
+    except FileNotFoundError as e:
+        st.error(f"File not found : {e.filename or file_name}")
         st.info("Please confirm file path and permission!")
     except Exception as e:
         st.error(f"Error: {str(e)}")
@@ -170,25 +292,143 @@ def downloadData(file_path):
 
 
 
+# 实时区块的刷新间隔（秒）：每次只读取后台线程已发布的结果，不重新计算
+LIVE_REFRESH_SECONDS = 30
+
+
+@st.cache_resource(max_entries=64)
+def chart_figure(store_path, version, window, _data):
+    """
+    按 (存储, 发布版本, 时间窗口) 缓存曲线图（所有会话共享），数据版本不变时不重新绘制。
+    """
+    sensor_status_df = _data['status']
+    x_range = None
+    if TIME_WINDOWS[window] is not None and sensor_status_df['latestTime'].notna().any():
+        end = sensor_status_df['latestTime'].max()
+        x_range = (end - pd.Timedelta(days=TIME_WINDOWS[window]), end)
+    # 曲线只需要每段厚度的首末两个点，不必把每条心跳读数都发给浏览器
+    return plot_sensor_data_from_dict(_data['chart'], x_range=x_range, calibration=_data['calibration'])
+
+
+@st.fragment(run_every=LIVE_REFRESH_SECONDS)
+def live_status_section(worker):
+    """
+    传感器实时状态区块。作为独立片段定时刷新，只重新执行本区块而不是整个页面；
+    数据未变化时输出与上次相同，Streamlit按消息哈希去重，几乎不产生额外传输。
+    """
+    _, data = worker.snapshot()
+    sensor_status_df, steps, forecast = data['status'], data['steps'], data['forecast']
+    calibration = data['calibration']
+    # 显示传感器状态指标
+    for row in sensor_status_df.itertuples():
+        sensor_name = row.sensorName
+        latest_time = row.latestTime
+        total_len = row.totalLength  # 厚度已在加载时按 calibration.yaml 校准
+        actual_len = row.actualLength
+
+        # 显示metric
+        if pd.notna(total_len):
+            st.caption(f"Latest Reading at: {latest_time}")
+            delta_val = actual_len - total_len
+            st.metric(
+                label=f":material/Sensors: {sensor_name} Sensor Reading",
+                value=f"{actual_len:g}mm",
+                delta=delta_val,
+                border=True
+            )
+            if sensor_name in forecast.index:
+                fc = forecast.loc[sensor_name]
+                if pd.notna(fc['orderDate']) or pd.notna(fc['replaceDate']):
+                    fmt = lambda d: f"{d:%Y-%m-%d}" if pd.notna(d) else "n/a"
+                    # 预测目标为区间上界，按该传感器的校准系数显示
+                    scale, offset = calibration.coefficients(sensor_name) if calibration is not None else (1.0, 0.0)
+                    order_mm, replace_mm = (DEFAULT_SCHEME.upper_bound(band) * scale + offset
+                                            for band in ('order', 'replace'))
+                    st.caption(
+                        f"Wear rate {fc['wearRate']:.2f} mm/day · {order_mm:g}mm by {fmt(fc['orderDate'])}"
+                        f" · {replace_mm:g}mm by {fmt(fc['replaceDate'])}"
+                    )
+        else:
+            st.metric(
+                label=f":material/Sensors: {sensor_name} Sensor Reading",
+                value="No Wear Data Received",
+                border=True
+            )
+            continue  # 无数据时跳过后续判断
+
+        # 根据状态区间进行条件判断（区间已在 get_latest_sensor_status 中统一计算）
+        if row.band == 'ok':
+            st.info("Acceptable thickness, use as normal!")
+            # 若当前厚度不等于初始厚度，显示区间信息
+            if actual_len != total_len:
+                # 在该传感器的历史厚度台阶中查找更大的相邻值
+                next_larger = steps.next_larger(sensor_name, actual_len)
+                if next_larger is not None:
+                    st.info(f"Actual thickness is between {actual_len:g} and {next_larger:g}")
+        elif row.band == 'order':
+            st.info("Please order trays!")
+        elif row.band == 'inspect':
+            st.warning("Wearing thin, inspections required!")
+        elif row.band == 'replace':
+            st.error("Replace!")
+
+
+@st.fragment(run_every=LIVE_REFRESH_SECONDS)
+def live_plot_section(worker, view_key):
+    """
+    传感器曲线区块，与状态区块一样独立刷新；切换时间窗口也只重新执行本区块。
+    会话中只保存视图参数（按 view_key 区分资产的时间窗口），数据来自共享快照。
+    """
+    version, data = worker.snapshot()
+    # 绘制传感器曲线
+    st.markdown("###")
+    st.markdown("3. Wear Sensor Plots")
+    window = st.radio("Time Window", list(TIME_WINDOWS), horizontal=True, key=f"{view_key}:window")
+    st.plotly_chart(chart_figure(worker.store.path, version, window, data))
+
+
+ASSET_ID = "golding-830e-2507"
+
+
 def app():
-    st.subheader("Newmont Boddington Wear Sensor Trial - Linerless Tray", divider='rainbow')
+    """Boddington 830E 2507 货箱页面（资产登记表中的 ASSET_ID）。"""
+    asset_app(load_registry().get(ASSET_ID))
+
+
+def asset_app(asset):
+    """
+    单个资产的页面，文件路径和显示信息来自资产登记表（assets.yaml）。
+    车队中的每台卡车共用这一个页面函数，不再为每台卡车复制页面模块。
+    """
+    # 共享缓存以写时复制视图分发给各会话，打开数据页面时显式开启
+    enable_copy_on_write()
+    st.subheader(asset.heading, divider='rainbow')
     
     # 文件路径
-    latest_file = "pwsReadingsLatest.xlsx"
-    db_file = "Boddington_pwsTray_Database_update.xlsx"
+    latest_file = asset.latest_file
+    db_file = asset.db_file
+    store_file = asset.store_file
+    drop_dir = asset.drop_dir  # 网关上传带时间戳读数文件的目录
+    store = get_view(store_file, db_file)
     
-    # 1. 更新数据库并获取最新数据字典
-    db_dict, latest_df = update_database_from_latest(latest_file, db_file)
+    # 数据的读取、入库和状态计算都在后台线程完成，这里只取已发布的结果
+    worker = get_worker(latest_file, store_file, db_file, drop_dir)
+    _, data = worker.snapshot()
+    if worker.last_error is not None:
+        st.warning(f"Live data update failed, showing last available data: {worker.last_error}")
+    if data is None:
+        st.info("Sensor data is loading, please refresh shortly.")
+        return
     
-    # 2. 获取传感器最新状态
-    sensor_status_df = get_latest_sensor_status(db_dict)
+    # 最新读数和传感器最新状态（状态区块和曲线由定时刷新的片段读取快照）
+    latest_df, sensor_status_df = data['latest_df'], data['status']
     
     # ------------------ 界面显示 ------------------
     st.markdown("1. Wear Sensor Installation Details")
     Tray1, Tray2 = st.tabs(["LinerLess Tray w/ Passive Wear Sensor", "Future Trials"])
     
     with Tray1:
-        st.image("pwsTray.png", caption="Linerless Tray Passive Wear Sensor Install Locations", width='stretch')
+        st.image(asset_image(asset.image or "pwsTray.png"), caption="Linerless Tray Passive Wear Sensor Install Locations", width='stretch')
     
     # 您之前设计的HTML代码（已包含所有样式和动画）
     html_code = """
@@ -450,68 +690,16 @@ def app():
     Tray1_sensor, Tray2_sensor = st.tabs(["LinerLess Tray w/ Passive Wear Sensor", "Debug & Data Table"])
     
     with Tray1_sensor:
-        # 显示传感器状态指标
-        for row in sensor_status_df.itertuples():
-            sensor_name = row.sensorName
-            latest_time = row.latestTime
-            total_len = row.totalLength + 1  # 加1mm作为初始厚度的容差
-            actual_len = row.actualLength + 1  # 加1mm作为当前厚度的容差
-
-            # 显示metric
-            if pd.notna(total_len):
-                st.caption(f"Latest Reading at: {latest_time}")
-                delta_val = actual_len - total_len
-                st.metric(
-                    label=f":material/Sensors: {sensor_name} Sensor Reading",
-                    value=f"{actual_len}mm",
-                    delta=delta_val,
-                    border=True
-                )
-            else:
-                st.metric(
-                    label=f":material/Sensors: {sensor_name} Sensor Reading",
-                    value="No Wear Data Received",
-                    border=True
-                )
-                continue  # 无数据时跳过后续判断
-
-            # 根据CurrentThickness进行条件判断
-            if actual_len is not None and pd.notna(actual_len):
-                # 获取该传感器的历史CurrentThickness列（去重排序）
-                sheet_df = db_dict.get(sensor_name)
-                thickness_vals = []
-                if sheet_df is not None and not sheet_df.empty:
-                    thickness_vals = sheet_df['CurrentThickness'].drop_duplicates().sort_values(ascending=False).tolist()
-
-                # 条件分支
-                if actual_len > 18:
-                    st.info("Acceptable thickness, use as normal!")
-                    # 若当前厚度不等于初始厚度，显示区间信息
-                    if actual_len != total_len:
-                        if thickness_vals and actual_len in thickness_vals:
-                            idx = thickness_vals.index(actual_len)
-                            if idx > 0:  # 存在更大的值
-                                next_larger = thickness_vals[idx - 1]
-                                st.info(f"Actual thickness is between {actual_len} and {next_larger}")
-                elif actual_len == 18:
-                    st.info("Please order trays!")
-                elif 10 < actual_len < 18:
-                    st.warning("Wearing thin, inspections required!")
-                elif actual_len == 10:
-                    st.error("Replace!")
+        live_status_section(worker)
         
         
         
-        # 绘制传感器曲线
-        st.markdown("###")
-        st.markdown("3. Wear Sensor Plots")
-        fig = plot_sensor_data_from_dict(db_dict)
-        st.plotly_chart(fig)
+        live_plot_section(worker, asset.id)
         
         # 下载数据库按钮（需调整downloadData以适配新列名，此处暂不调用）
         # data download function
         st.markdown("###")
-        downloadData(db_file)
+        downloadData(store, db_file, sensor_status_df)
     
     with Tray2_sensor:
         # 显示最新读数文件内容表格
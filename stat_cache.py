@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+import os
+import threading
+
+# 只依赖标准库：登录页（auth）和导航（asset_registry）在导入pandas之前就会用到
+
+
+class StatCache:
+    """
+    进程级的文件解析缓存（所有会话共享、线程安全）：按文件的 (mtime_ns, size) 判断是否变化，
+    未变化时直接返回上次的结果，变化后重新解析并替换。
+    与 data_cache.load_cached 不同，这里不计算文件哈希，适合配置文件、图片等小文件。
+    """
+    def __init__(self):
+        self._entries = {}  # (绝对路径, key) -> ((mtime_ns, size), 结果)
+        self._lock = threading.Lock()
+
+    def get(self, path, build, key=None):
+        """
+        返回 build(绝对路径) 的缓存结果。同一文件需要多种结果时（例如不同宽度的缩略图）
+        用 key 区分。
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            cached = self._entries.get((path, key))
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        result = build(path)
+        with self._lock:
+            self._entries[(path, key)] = (signature, result)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""入库端点联调测试：在本地线程中启动 IngestServer，用 post_readings / HTTP 请求上传读数。"""
+import http.client
+import json
+import urllib.error
+
+import pandas as pd
+import pytest
+
+from ingest_server import post_readings, start_in_thread, stop_in_thread
+from sensor_store import open_store
+
+
+@pytest.fixture
+def server(tmp_path):
+    store = open_store(str(tmp_path / "readings.sqlite"))
+    server = start_in_thread(store)
+    try:
+        yield server
+    finally:
+        stop_in_thread(server)
+
+
+def _request(server, body, headers):
+    conn = http.client.HTTPConnection(server.host, server.port, timeout=10)
+    try:
+        conn.putrequest('POST', '/readings')
+        for name, value in headers.items():
+            conn.putheader(name, value)
+        conn.endheaders()
+        conn.send(body)
+        response = conn.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        conn.close()
+
+
+def test_post_json_readings(server):
+    url = f"http://{server.host}:{server.port}/readings"
+    readings = pd.DataFrame({
+        'uploadTime': pd.to_datetime(['2026-01-05 00:00:00', '2026-01-06 00:00:00']),
+        'ID': ['01C', '01C'],
+        'SensorTotalLength': [31.0, 31.0],
+        'SensorCurrentLength': [22.0, 21.0],
+    })
+    assert post_readings(url, readings) == {'received': 2, 'ingested': 2}
+    # 重复上传不会产生重复读数
+    assert post_readings(url, readings)['received'] == 2
+    frames = server.store.load()
+    assert list(frames) == ['BDT-LLT-01C']
+    assert frames['BDT-LLT-01C']['CurrentThickness'].tolist() == [22.0, 21.0]
+
+    # 补传早于已有读数的积压数据
+    backlog = readings.assign(uploadTime=pd.to_datetime(['2026-01-01', '2026-01-02']),
+                              SensorCurrentLength=[24.0, 23.0])
+    post_readings(url, backlog)
+    assert server.store.load()['BDT-LLT-01C']['CurrentThickness'].tolist() == [24.0, 23.0, 22.0, 21.0]
+
+
+def test_post_csv_keeps_id_text(server):
+    body = b"uploadTime,ID,SensorTotalLength,SensorCurrentLength\n2026-01-05 00:00:00,001,31,22\n"
+    status, payload = _request(server, body, {'Content-Type': 'text/csv', 'Content-Length': str(len(body))})
+    assert (status, payload) == (200, {'received': 1, 'ingested': 1})
+    assert list(server.store.load()) == ['BDT-LLT-001']
+
+
+@pytest.mark.parametrize('body, headers', [
+    (b'{}', {'Content-Type': 'application/json', 'Content-Length': 'abc'}),
+    (b'[{"uploadTime": "not a time", "ID": "01C", "SensorTotalLength": 31, "SensorCurrentLength": 22}]',
+     {'Content-Type': 'application/json'}),
+    (b'[{"ID": "01C"}]', {'Content-Type': 'application/json'}),
+    (b'not json', {'Content-Type': 'application/json'}),
+    (b'[{"uploadTime": "2026-01-05", "ID": "01C", "SensorTotalLength": "abc", "SensorCurrentLength": 22}]',
+     {'Content-Type': 'application/json'}),
+    (b'[{"uploadTime": "2026-01-05", "ID": null, "SensorTotalLength": 31, "SensorCurrentLength": 22}]',
+     {'Content-Type': 'application/json'}),
+    (b'[{"uploadTime": "2026-01-05", "ID": "01C", "SensorTotalLength": 31, "SensorCurrentLength": null}]',
+     {'Content-Type': 'application/json'}),
+    (b"uploadTime,ID,SensorTotalLength,SensorCurrentLength\n2026-01-05,,31,22\n", {'Content-Type': 'text/csv'}),
+    (b"uploadTime,ID,SensorTotalLength,SensorCurrentLength\n2026-01-05,01C,31,\n", {'Content-Type': 'text/csv'}),
+])
+def test_bad_requests_return_400(server, body, headers):
+    headers = dict({'Content-Length': str(len(body))}, **headers)
+    status, payload = _request(server, body, headers)
+    assert status == 400
+    assert 'error' in payload
+    assert server.store.load() == {}
+
+
+def test_post_readings_raises_on_http_error(server):
+    url = f"http://{server.host}:{server.port}/readings"
+    with pytest.raises(urllib.error.HTTPError) as e:
+        post_readings(url, [{'ID': '01C'}])
+    assert e.value.code == 400
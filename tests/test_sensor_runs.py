@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""游程存储补传较早读数：只拆分或延长所在位置的游程，其他游程的边界保持不变。"""
+import pandas as pd
+
+from sensor_runs import RunLengthStore
+
+
+def _rows(readings):
+    scan = pd.to_datetime([time for time, _ in readings])
+    current = [value for _, value in readings]
+    return pd.DataFrame({
+        'Sheet': 'BDT-LLT-01C',
+        'ServerUpdateTime': scan + pd.Timedelta(seconds=5),
+        'SensorScanTime': scan,
+        'InitialThickness': 31.0,
+        'CurrentThickness': current,
+        'Wear': [31.0 - value for value in current],
+    })
+
+
+def _runs(store):
+    runs = store.load_runs()['BDT-LLT-01C']
+    return [(row.CurrentThickness, row.FirstSeen, row.LastSeen, row.Heartbeats) for row in runs.itertuples()]
+
+
+def test_backfill_into_middle_of_run_keeps_boundaries(tmp_path):
+    store = RunLengthStore(str(tmp_path / "runs.sqlite"))
+    store.append(_rows([('2026-03-03', 31.0), ('2026-08-21', 31.0), ('2026-08-22', 31.0),
+                        ('2026-09-01', 30.0), ('2026-09-05', 30.0), ('2026-10-01', 26.0)]))
+    before = _runs(store)
+
+    store.append(_rows([('2026-05-01', 26.0)]))
+    after = _runs(store)
+    # 被拆分的31mm游程保留原来的首末时间，心跳次数不变
+    head, new, tail = after[:3]
+    assert (head[0], head[1], head[3]) == (31.0, pd.Timestamp('2026-03-03'), 1)
+    assert new == (26.0, pd.Timestamp('2026-05-01'), pd.Timestamp('2026-05-01'), 1)
+    assert (tail[0], tail[2], tail[3]) == (31.0, pd.Timestamp('2026-08-22'), 2)
+    assert head[2] < new[1] < tail[1]
+    # 其他游程完全不变
+    assert after[3:] == before[1:]
+
+    # 落在同厚度游程范围内的重复读数被忽略；游程之间的读数延长相邻的同厚度游程
+    store.append(_rows([('2026-09-03', 30.0), ('2026-09-10', 30.0)]))
+    assert _runs(store)[3] == (30.0, pd.Timestamp('2026-09-01'), pd.Timestamp('2026-09-10'), 3)
+    assert _runs(store)[4:] == before[2:]
+    assert sum(run[3] for run in _runs(store)) == 8
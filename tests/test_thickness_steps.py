@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+"""入库时按校准视图增量更新厚度台阶索引，不在每次数据版本变化时重新构建。"""
+import pandas as pd
+
+import thickness_steps
+from sensor_calibration import CalibratedStore
+from sensor_ingest import ingest_latest
+from sensor_store import open_store
+
+
+def _readings(times, currents):
+    return pd.DataFrame({
+        'uploadTime': pd.to_datetime(times),
+        'ID': ['01C'] * len(times),
+        'SensorTotalLength': [31.0] * len(times),
+        'SensorCurrentLength': currents,
+    })
+
+
+def test_ingest_updates_calibrated_index_incrementally(tmp_path, monkeypatch):
+    calibration = tmp_path / "calibration.yaml"
+    calibration.write_text("version: 1\ndefault:\n  offset: 1.0\n", encoding='utf-8')
+    store = open_store(str(tmp_path / "readings.sqlite"))
+    view = CalibratedStore(store, str(calibration))
+    ingest_latest(_readings(['2026-01-01'], [31.0]), store, view=view)
+
+    index = thickness_steps.step_index(view)
+    assert index.steps('BDT-LLT-01C') == (32.0,)
+
+    rebuilt = []
+    original = thickness_steps.ThicknessStepIndex.from_frames
+    monkeypatch.setattr(thickness_steps.ThicknessStepIndex, 'from_frames',
+                        classmethod(lambda cls, frames: rebuilt.append(1) or original(frames)))
+    ingest_latest(_readings(['2026-01-02'], [30.0]), store, view=view)
+    assert thickness_steps.step_index(view) is index
+    assert index.steps('BDT-LLT-01C') == (31.0, 32.0)
+    assert rebuilt == []
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""状态区间分类：每条刻度线（含 calibration.yaml 的默认校准）都落在预期的区间。"""
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from sensor_calibration import CalibrationTable, load_calibration
+from wear_bands import DEFAULT_SCHEME, SENSOR_LINES, band_history
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# 每条刻度线的预期区间
+EXPECTED_BANDS = {31: 'ok', 30: 'ok', 26: 'ok', 22: 'ok', 18: 'order', 14: 'inspect', 12: 'inspect', 10: 'replace'}
+
+
+def test_expected_bands_cover_all_lines():
+    assert set(EXPECTED_BANDS) == set(SENSOR_LINES)
+
+
+@pytest.mark.parametrize('calibration', [
+    CalibrationTable(),
+    load_calibration(os.path.join(ROOT, 'calibration.yaml')),
+    CalibrationTable(default={'scale': 1.02, 'offset': -1.5}),
+], ids=['raw', 'calibration.yaml', 'scaled'])
+def test_calibrated_lines_land_in_intended_band(calibration):
+    scale, offset = calibration.default
+    lines = np.array(SENSOR_LINES, dtype='float64')
+    calibrated = lines * scale + offset
+    bands = DEFAULT_SCHEME.classify(calibrated, scale, offset)
+    assert dict(zip(SENSOR_LINES, bands)) == EXPECTED_BANDS
+    # 浮点误差不改变分类
+    assert list(DEFAULT_SCHEME.classify(calibrated + 1e-9, scale, offset)) == list(bands)
+    assert list(DEFAULT_SCHEME.classify(calibrated - 1e-9, scale, offset)) == list(bands)
+
+
+def test_threshold_lines_follow_calibration():
+    lines = DEFAULT_SCHEME.threshold_lines(1.0, 1.0)
+    assert [y for y, _ in lines] == [y + 1 for y in SENSOR_LINES]
+    assert dict(lines)[19] == 'blue' and dict(lines)[11] == 'red'
+
+
+def test_band_history_uses_per_sensor_calibration():
+    calibration = CalibrationTable(default={'offset': 1.0}, sensors={'B': {'offset': 0.0}})
+    long_df = pd.DataFrame({
+        'sensorName': ['A', 'A', 'B', 'B'],
+        'SensorScanTime': pd.to_datetime(['2026-01-01', '2026-01-02', '2026-01-01', '2026-01-02']),
+        'CurrentThickness': [23.0, 19.0, 22.0, 18.0],
+    })
+    history = band_history(long_df, calibration=calibration)
+    assert list(history['band']) == ['ok', 'order', 'ok', 'order']
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""磨损预测：目标厚度取区间边界，并按各传感器的校准系数换算。"""
+import pandas as pd
+
+from sensor_calibration import CalibrationTable
+from wear_bands import DEFAULT_SCHEME
+from wear_forecast import forecast_wear
+
+
+def _long_frame():
+    t0 = pd.Timestamp('2026-01-01')
+    return pd.DataFrame({
+        'sensorName': ['A', 'A', 'B', 'B'],
+        'SensorScanTime': [t0, t0 + pd.Timedelta(days=10)] * 2,
+        'CurrentThickness': [23.0, 19.0, 23.0, 19.0],
+    })
+
+
+def test_targets_follow_band_boundaries():
+    assert DEFAULT_SCHEME.upper_bound('order') == 18
+    assert DEFAULT_SCHEME.upper_bound('replace') == 10
+    assert DEFAULT_SCHEME.upper_bound('ok') == float('inf')
+
+
+def test_forecast_uses_per_sensor_calibration():
+    # A 的校准偏移为+1：原始18（order 区间上界）在校准后为19，B 不做校准
+    calibration = CalibrationTable(default={'offset': 1.0}, sensors={'B': {'offset': 0.0}})
+    forecast = forecast_wear(_long_frame(), calibration=calibration).set_index('sensorName')
+    t0 = pd.Timestamp('2026-01-01')
+    # 斜率 -0.4 mm/天
+    assert forecast.loc['A', 'wearRate'] == forecast.loc['B', 'wearRate'] == 0.4
+    # A 的19mm已经落在 order 区间，取第一次进入的时间；replace 目标为校准后的11mm
+    assert forecast.loc['A', 'orderDate'] == t0 + pd.Timedelta(days=10)
+    assert forecast.loc['A', 'replaceDate'] == t0 + pd.Timedelta(days=30)
+    # B 仍在 ok 区间，按原始刻度线18和10预测
+    assert forecast.loc['B', 'orderDate'] == t0 + pd.Timedelta(days=12.5)
+    assert forecast.loc['B', 'replaceDate'] == t0 + pd.Timedelta(days=32.5)
+    # 与状态分类一致
+    assert DEFAULT_SCHEME.band_of(19.0, *calibration.coefficients('A')) == 'order'
+    assert DEFAULT_SCHEME.band_of(19.0, *calibration.coefficients('B')) == 'ok'
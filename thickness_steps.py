@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+import threading
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+
+# 进程级索引：存储路径 -> (数据版本, ThicknessStepIndex)
+_INDEXES = {}
+_LOCK = threading.Lock()
+
+
+class ThicknessStepIndex:
+    """
+    每个传感器出现过的厚度台阶（升序、去重），用于查找当前厚度所在的区间。
+    查询用二分查找；更新时整体替换该传感器的元组，读者始终看到一致的台阶列表。
+    """
+    def __init__(self):
+        self._steps = {}
+
+    @classmethod
+    def from_frames(cls, db_dict):
+        """从数据库字典 {sensor: DataFrame} 构建索引。"""
+        index = cls()
+        for sensor, df in db_dict.items():
+            index.add(sensor, df['CurrentThickness'])
+        return index
+
+    def add(self, sensor, values):
+        """把一批厚度值加入该传感器的台阶（已存在的忽略）。"""
+        values = np.asarray(values, dtype='float64')
+        values = values[~np.isnan(values)]
+        current = self._steps.get(sensor, ())
+        merged = np.union1d(current, values)
+        if len(merged) != len(current):
+            self._steps[sensor] = tuple(merged.tolist())
+        elif sensor not in self._steps:
+            self._steps[sensor] = ()
+
+    def add_rows(self, rows):
+        """增量入库的新行（带 Sheet 列）加入索引。"""
+        for sensor, sensor_rows in rows.groupby('Sheet', sort=False):
+            self.add(sensor, sensor_rows['CurrentThickness'])
+
+    def steps(self, sensor):
+        """该传感器的全部台阶（升序元组）。"""
+        return self._steps.get(sensor, ())
+
+    def next_larger(self, sensor, value):
+        """大于 value 的最小台阶，不存在时返回None。"""
+        steps = self.steps(sensor)
+        i = bisect_right(steps, value)
+        return steps[i] if i < len(steps) else None
+
+    def next_smaller(self, sensor, value):
+        """小于 value 的最大台阶，不存在时返回None。"""
+        steps = self.steps(sensor)
+        i = bisect_left(steps, value)
+        return steps[i - 1] if i > 0 else None
+
+    def bracket(self, sensor, value):
+        """返回 (next_smaller, next_larger)，即 value 两侧相邻的台阶。"""
+        return self.next_smaller(sensor, value), self.next_larger(sensor, value)
+
+
+def step_index(store):
+    """
+    返回存储对应的台阶索引（进程内共享）。首次使用时从全部数据构建一次；
+    之后由 update_step_index 在入库时增量维护，只有数据被其他途径改动
+    （版本号对不上）时才重新构建。
+    """
+    version = store.version()
+    with _LOCK:
+        cached = _INDEXES.get(store.path)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+    index = ThicknessStepIndex.from_frames(store.load())
+    with _LOCK:
+        _INDEXES[store.path] = (version, index)
+    return index
+
+
+def update_step_index(store, rows, previous_version=None):
+    """
+    增量入库后调用：把新行的厚度加入已构建的索引，并记录新的数据版本。
+    previous_version 为写入前的数据版本；索引不是按该版本构建的（期间数据被其他途径改动）时
+    不做增量更新，下次 step_index 时重新构建。
+    """
+    with _LOCK:
+        cached = _INDEXES.get(store.path)
+        if cached is None:
+            return
+        if previous_version is not None and cached[0] != previous_version:
+            del _INDEXES[store.path]
+            return
+        index = cached[1]
+        index.add_rows(rows)
+        _INDEXES[store.path] = (store.version(), index)
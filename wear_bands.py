@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+
+# 默认区间（按下界升序）：(区间名, 下界, 是否包含下界)，以传感器刻度线（原始读数）为单位
+#   replace: <= 10 ；inspect: 10 < x <= 14 ；order: 14 < x <= 18 ；ok: > 18
+# 传感器读数只会落在刻度线上，每个区间覆盖相邻刻度线之间的整段，不依赖数值相等
+DEFAULT_BANDS = (
+    ('replace', -np.inf, True),
+    ('inspect', 10, False),
+    ('order', 14, False),
+    ('ok', 18, False),
+)
+# 传感器的磨损刻度线（mm）
+SENSOR_LINES = (31, 30, 26, 22, 18, 14, 12, 10)
+BAND_COLORS = {'ok': 'black', 'order': 'blue', 'inspect': 'orange', 'replace': 'red'}
+
+
+class BandScheme:
+    """
+    厚度 -> 告警区间的分类器。区间由下界定义，每个区间一直延伸到下一个区间的下界；
+    分类对整个数组一次 searchsorted 完成，可直接用于上百万行的历史数据。
+    与区间边界相差不超过 atol 的数值视为等于边界，避免浮点误差改变分类结果。
+    区间和刻度线以传感器原始读数为单位；对校准后的厚度分类时传入校准系数 (scale, offset)，
+    先换算回原始读数再比较，校准偏移不会让刻度线跨到相邻区间。
+    """
+    def __init__(self, bands=DEFAULT_BANDS, atol=1e-6, colors=None, lines=SENSOR_LINES):
+        self.names = [name for name, _, _ in bands]
+        lowers = np.array([lower for _, lower, _ in bands], dtype='float64')
+        if np.any(np.diff(lowers) < 0):
+            raise ValueError("band lower bounds must be in ascending order")
+        self.atol = atol
+        self._bounds = lowers
+        # 不包含下界的区间等价于从比下界大一点的位置开始，分类时统一用 side='right'
+        inclusive = np.array([inc for _, _, inc in bands], dtype=bool)
+        self._lowers = np.where(inclusive, lowers - atol, lowers + atol)
+        self.colors = dict(BAND_COLORS if colors is None else colors)
+        self.lines = tuple(lines)
+
+    def codes(self, values, scale=1.0, offset=0.0):
+        """
+        返回每个值所属区间的下标（int8），NaN或低于最低下界的值为-1。
+        values 为校准后的厚度时，scale/offset 为对应的校准系数（标量或与 values 等长的数组）。
+        """
+        values = (np.asarray(values, dtype='float64') - offset) / scale
+        codes = np.searchsorted(self._lowers, values, side='right') - 1
+        codes[np.isnan(values)] = -1
+        return codes.astype('int8')
+
+    def classify(self, values, scale=1.0, offset=0.0):
+        """返回区间名称的 Categorical（无对应区间为NaN）。"""
+        return pd.Categorical.from_codes(self.codes(values, scale, offset), categories=self.names)
+
+    def band_of(self, value, scale=1.0, offset=0.0):
+        """单个数值的区间名称，无对应区间返回None。"""
+        code = int(self.codes([value], scale, offset)[0])
+        return self.names[code] if code >= 0 else None
+
+    def upper_bound(self, name):
+        """区间的上界（原始读数），即下一个区间的下界；最高的区间为inf。"""
+        index = self.names.index(name)
+        return float(self._bounds[index + 1]) if index + 1 < len(self.names) else np.inf
+
+    def threshold_lines(self, scale=1.0, offset=0.0):
+        """
+        绘图用的刻度线 [(厚度, 颜色)]，颜色取刻度线所在区间的颜色。
+        传入校准系数时刻度线画在校准后的位置，与校准后的曲线对齐。
+        """
+        codes = self.codes(self.lines)
+        return [(y * scale + offset, self.colors.get(self.names[c], 'gray') if c >= 0 else 'gray')
+                for y, c in zip(self.lines, codes)]
+
+
+DEFAULT_SCHEME = BandScheme()
+
+
+def band_history(long_df, scheme=DEFAULT_SCHEME, value_col='CurrentThickness', calibration=None):
+    """
+    计算长表（sensorName, SensorScanTime, ... 已按传感器、扫描时间排序）中每个传感器
+    进入新区间的时刻，返回列 sensorName, SensorScanTime, value, band 的DataFrame。
+    用于报表和告警：只保留区间发生变化的行（包括每个传感器的第一行）。
+    长表来自校准视图时传入 calibration（sensor_calibration.CalibrationTable）。
+    """
+    values = long_df[value_col].to_numpy(dtype='float64')
+    sensors = long_df['sensorName'].to_numpy()
+    scale, offset = 1.0, 0.0
+    if calibration is not None:
+        codes, names = pd.factorize(sensors)
+        scale, offset = (coef[codes] for coef in calibration.coefficient_arrays(names))
+    codes = scheme.codes(values, scale, offset)
+    changed = np.ones(len(codes), dtype=bool)
+    if len(codes) > 1:
+        changed[1:] = (codes[1:] != codes[:-1]) | (sensors[1:] != sensors[:-1])
+    return pd.DataFrame({
+        'sensorName': sensors[changed],
+        'SensorScanTime': long_df['SensorScanTime'].to_numpy()[changed],
+        'value': values[changed],
+        'band': pd.Categorical.from_codes(codes[changed], categories=scheme.names),
+    })
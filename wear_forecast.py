@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+import threading
+
+import numpy as np
+import pandas as pd
+
+from sensor_store import load_long_frame
+from wear_bands import DEFAULT_SCHEME
+
+# 预测的目标区间：结果列名 -> 区间名。目标厚度为该区间的上界（DEFAULT_SCHEME 中 order 为18、
+# replace 为10，原始读数），按各传感器的校准系数换算，与状态分类和刻度线一致
+FORECAST_TARGETS = {'orderDate': 'order', 'replaceDate': 'replace'}
+# 每个传感器最多使用最近的台阶变化点数（Theil-Sen 需要两两配对，点数平方增长）
+MAX_POINTS = 32
+NS_PER_DAY = 86400 * 10**9
+MAX_HORIZON_DAYS = 36500  # 超过100年的预测视为不会到达
+
+# 进程级缓存：存储路径 -> (数据版本, 预测结果)
+_FORECASTS = {}
+_LOCK = threading.Lock()
+
+
+def transition_points(long_df, value_col='CurrentThickness'):
+    """
+    从长表（已按传感器、扫描时间排序）中取出每个传感器厚度发生变化的点，
+    即每个台阶第一次出现的时刻（包括每个传感器的第一条读数）。
+    """
+    sensors = long_df['sensorName'].to_numpy()
+    values = long_df[value_col].to_numpy(dtype='float64')
+    changed = np.ones(len(values), dtype=bool)
+    if len(values) > 1:
+        changed[1:] = (values[1:] != values[:-1]) | (sensors[1:] != sensors[:-1])
+    changed &= ~np.isnan(values)
+    return long_df.loc[changed, ['sensorName', 'SensorScanTime', value_col]].reset_index(drop=True)
+
+
+def _padded(points, value_col, max_points):
+    """把变化点排成 (传感器数, max_points) 的二维数组，不足的位置为NaN。"""
+    codes, names = pd.factorize(points['sensorName'], sort=False)
+    counts = np.bincount(codes, minlength=len(names))
+    starts = np.cumsum(counts) - counts
+    position = np.arange(len(codes)) - starts[codes]
+    # 只保留每个传感器最近的 max_points 个点
+    position -= np.maximum(counts - max_points, 0)[codes]
+    keep = position >= 0
+    times = np.full((len(names), max_points), np.nan)
+    values = np.full((len(names), max_points), np.nan)
+    scan_ns = points['SensorScanTime'].to_numpy('datetime64[ns]').view('int64')
+    # 时间以每个传感器第一个保留点为原点（天），避免大数相减的精度损失
+    origin = np.zeros(len(names), dtype='int64')
+    first = position == 0
+    origin[codes[first]] = scan_ns[first]
+    times[codes[keep], position[keep]] = (scan_ns[keep] - origin[codes[keep]]) / NS_PER_DAY
+    values[codes[keep], position[keep]] = points[value_col].to_numpy(dtype='float64')[keep]
+    return names, origin, times, values
+
+
+def theil_sen(times, values):
+    """
+    按行对二维数组做 Theil-Sen 稳健回归（NaN为缺失），返回 (斜率, 截距)。
+    斜率为所有点对斜率的中位数，截距为 values - 斜率*times 的中位数；不足两个有效点的行为NaN。
+    """
+    dt = times[:, None, :] - times[:, :, None]
+    dy = values[:, None, :] - values[:, :, None]
+    upper = np.triu(np.ones(dt.shape[1:], dtype=bool), k=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slopes = np.where(upper & (dt > 0), dy / dt, np.nan)
+    slopes = slopes.reshape(len(times), -1)
+    valid = ~np.isnan(slopes).all(axis=1)
+    slope = np.full(len(times), np.nan)
+    intercept = np.full(len(times), np.nan)
+    if valid.any():
+        slope[valid] = np.nanmedian(slopes[valid], axis=1)
+        intercept[valid] = np.nanmedian(values[valid] - slope[valid, None] * times[valid], axis=1)
+    return slope, intercept
+
+
+def forecast_wear(long_df, targets=FORECAST_TARGETS, max_points=MAX_POINTS, scheme=DEFAULT_SCHEME,
+                  calibration=None):
+    """
+    按传感器拟合磨损速率并预测进入目标区间的日期，所有传感器一次向量化完成。
+    返回DataFrame，列：sensorName, points, wearRate（mm/天，正数表示在磨损）,
+    以及 targets 中的每个日期列。已经进入目标区间的传感器取第一次进入的时间；
+    厚度没有下降趋势的传感器为NaT。
+    长表来自校准视图时传入 calibration（sensor_calibration.CalibrationTable），
+    目标厚度和区间判断按各传感器的校准系数换算。
+    """
+    points = transition_points(long_df)
+    columns = ['sensorName', 'points', 'wearRate'] + list(targets)
+    if points.empty:
+        return pd.DataFrame(columns=columns)
+    values_col = points['CurrentThickness'].to_numpy(dtype='float64')
+    names, origin, times, values = _padded(points, 'CurrentThickness', max_points)
+    slope, intercept = theil_sen(times, values)
+
+    codes = pd.factorize(points['sensorName'], sort=False)[0]
+    latest_idx = np.cumsum(np.bincount(codes, minlength=len(names))) - 1
+    scan_ns = points['SensorScanTime'].to_numpy('datetime64[ns]').view('int64')
+    latest_ns = scan_ns[latest_idx]
+    scale, offset = np.ones(len(names)), np.zeros(len(names))
+    if calibration is not None:
+        scale, offset = calibration.coefficient_arrays(names)
+    point_codes = scheme.codes(values_col, scale[codes], offset[codes])
+
+    result = pd.DataFrame({
+        'sensorName': names,
+        'points': np.bincount(codes, minlength=len(names)),
+        'wearRate': -slope,
+    })
+    for column, band in targets.items():
+        band_code = scheme.names.index(band)
+        target = scheme.upper_bound(band) * scale + offset
+        with np.errstate(divide='ignore', invalid='ignore'):
+            days = (target - intercept) / slope
+        reachable = (slope < 0) & (days <= MAX_HORIZON_DAYS)
+        days = np.where(reachable, days, 0)
+        projected = np.maximum(origin + (days * NS_PER_DAY).astype('int64'), latest_ns)
+        date = np.where(reachable, projected, np.iinfo('int64').min)
+        # 已经进入目标区间（或更低的区间）：第一次进入的时间
+        reached = (point_codes >= 0) & (point_codes <= band_code)
+        first_reached = np.full(len(names), np.iinfo('int64').max)
+        np.minimum.at(first_reached, codes[reached], scan_ns[reached])
+        date = np.where(reached[latest_idx], first_reached, date)
+        result[column] = date.view('datetime64[ns]')
+    return result
+
+
+def wear_forecast(store):
+    """返回存储当前数据版本的磨损预测（进程内共享，数据版本变化时重新拟合）。"""
+    version = store.version()
+    with _LOCK:
+        cached = _FORECASTS.get(store.path)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+    calibration = store.calibration() if hasattr(store, 'calibration') else None
+    forecast = forecast_wear(load_long_frame(store), calibration=calibration)
+    with _LOCK:
+        _FORECASTS[store.path] = (version, forecast)
+    return forecast